@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class SensorSource:
+    """
+    A blocking reader for one sensor channel.
+
+    Subclasses wrap a device (serial, I2C, ...). `read()` may block on I/O
+    for as long as it needs: it always runs on its own acquisition thread,
+    never on the UI thread.
+    """
+
+    def open(self):
+        pass
+
+    def read(self):
+        """Block until the next batch is available; return (times, values)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SimulatedSource(SensorSource):
+    """Stands in for a device by reading a SyntheticStream in batches."""
+
+    def __init__(self, stream, batch_interval=0.02, clock=time.monotonic):
+        self.stream = stream
+        self.batch_interval = batch_interval
+        self.clock = clock
+        self._deadline = None
+
+    def read(self):
+        now = self.clock()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.batch_interval
+        if self._deadline > now:
+            time.sleep(self._deadline - now)
+        else:
+            # Fell behind; don't try to burst through the missed batches
+            self._deadline = now
+        return self.stream.read(self.clock())
+
+
+class SampleQueue:
+    """
+    Bounded single-producer, single-consumer handoff of sample batches.
+
+    Built on a deque, whose append and popleft are atomic in CPython, so
+    neither side takes a lock. When the consumer stops draining, the oldest
+    batches are dropped and counted in `dropped` rather than blocking the
+    producer. `read(now)` has the same shape as SyntheticStream.read, so a
+    component can swap one for the other.
+    """
+
+    def __init__(self, max_batches=256):
+        self._batches = deque(maxlen=max_batches)
+        self.dropped = 0
+
+    def put(self, times, values):
+        if len(self._batches) == self._batches.maxlen:
+            self.dropped += 1
+        self._batches.append((times, values))
+
+    def read(self, now=None):
+        """Drain every queued batch as one (times, values) pair."""
+        batches = []
+        while True:
+            try:
+                batches.append(self._batches.popleft())
+            except IndexError:
+                break
+        if not batches:
+            return np.empty(0), np.empty(0)
+        if len(batches) == 1:
+            return batches[0]
+        times, values = zip(*batches)
+        return np.concatenate(times), np.concatenate(values)
+
+
+class AcquisitionThread(threading.Thread):
+    """
+    Runs one SensorSource, pushing every batch it reads into a queue,
+    through `filters` (e.g. a FilterChain) if given.
+    """
+
+    def __init__(self, source, queue, filters=None):
+        super().__init__(name=f"acquisition-{type(source).__name__}", daemon=True)
+        self.source = source
+        self.queue = queue
+        self.filters = filters
+        self._stopping = threading.Event()
+
+    def run(self):
+        self.source.open()
+        try:
+            while not self._stopping.is_set():
+                times, values = self.source.read()
+                if len(values):
+                    if self.filters is not None:
+                        values = self.filters.process(values)
+                    self.queue.put(times, values)
+        finally:
+            self.source.close()
+
+    def stop(self):
+        self._stopping.set()
+
+
+class Acquisition:
+    """Owns one AcquisitionThread per sensor source."""
+
+    def __init__(self):
+        self._threads = []
+
+    def add(self, source, max_batches=256, filters=None):
+        """Register `source` and return the SampleQueue it will feed."""
+        queue = SampleQueue(max_batches)
+        self._threads.append(AcquisitionThread(source, queue, filters))
+        return queue
+
+    def start(self):
+        for thread in self._threads:
+            if not thread.is_alive():
+                thread.start()
+
+    def stop(self, timeout=1.0):
+        for thread in self._threads:
+            thread.stop()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout)
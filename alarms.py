@@ -0,0 +1,262 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Wake this long before a deadline and spin the rest, to beat timer slack
+_SPIN = 0.001
+
+log = logging.getLogger(__name__)
+
+
+class TonePattern:
+    """
+    A buzzer pattern compiled to a fixed timeline.
+
+    `tones` is a list of (freq, on_time, off_time) steps making up one
+    cycle; the cycle plays `repeats` times, or forever if None. Compiling
+    turns the steps into (onset offset, stop offset, freq) triples relative
+    to the cycle start, so playing it never accumulates timing error.
+    """
+
+    def __init__(self, tones, repeats=None):
+        self.repeats = repeats
+        self.steps = []
+        offset = 0.0
+        for freq, on_time, off_time in tones:
+            self.steps.append((offset, offset + on_time, freq))
+            offset += on_time + off_time
+        self.period = offset
+
+    def phase(self, elapsed):
+        """
+        Where the pattern is `elapsed` seconds after it started.
+
+        Returns (sounding, remaining): whether a tone is on at that moment
+        and how long until the next start or stop.
+        """
+        cycle, t = divmod(elapsed, self.period)
+        if self.repeats is not None and cycle >= self.repeats:
+            return False, float("inf")
+        for onset, stop, _ in self.steps:
+            if t < onset:
+                return False, onset - t
+            if t < stop:
+                return True, stop - t
+        return False, self.period - t + self.steps[0][0]
+
+
+# Full blockage: 330Hz beep every 0.6s; partial blockage: 440Hz every 1.8s
+FULL_BLOCKAGE = TonePattern([(330, 0.3, 0.3)])
+PARTIAL_BLOCKAGE = TonePattern([(440, 0.9, 0.9)])
+
+
+class AlarmSequencer(threading.Thread):
+    """
+    Plays TonePatterns on a buzzer from a dedicated thread.
+
+    Every start and stop is scheduled against absolute monotonic deadlines
+    computed from the pattern's start time, so a late wake-up never shifts
+    later beeps. The thread asks the OS for real-time priority and falls
+    back silently if it is not allowed. `play`, `silence` and `shutdown`
+    may be called from any thread; they only post commands.
+
+    The lateness of every beep onset against its deadline is kept in
+    `onset_jitter` (seconds, most recent last); `jitter_stats()` summarizes
+    it.
+
+    A buzzer call that raises is logged and skipped, so the thread keeps
+    running later events; `failed` turns True (and `last_error` holds the
+    exception) so the UI can show that alarms may be silent.
+    """
+
+    def __init__(self, buzzer, clock=time.monotonic, history=512):
+        super().__init__(name="alarm-sequencer", daemon=True)
+        self.buzzer = buzzer
+        self.clock = clock
+        self.onset_jitter = deque(maxlen=history)
+        self.failed = False
+        self.last_error = None
+        self._commands = queue.Queue()
+        self._pattern = None
+        self._start = 0.0
+        self._events = iter(())
+        self._next = None
+
+    # ——— Thread-safe command API ———
+    def play(self, pattern, start=None):
+        """
+        Play `pattern`, replacing whatever is playing.
+
+        `start` is the clock time the pattern counts from (now by default);
+        passing it lets another timeline, like a blink, share the origin.
+        """
+        self._commands.put(("play", (pattern, start)))
+
+    def silence(self):
+        self._commands.put(("silence", (None, None)))
+
+    def shutdown(self, timeout=1.0):
+        self._commands.put(("quit", (None, None)))
+        if self.is_alive():
+            self.join(timeout)
+
+    def jitter_stats(self):
+        """Onset lateness in milliseconds: count, mean, p95 and max."""
+        if not self.onset_jitter:
+            return {"count": 0, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        ms = np.asarray(self.onset_jitter) * 1000
+        return {
+            "count": len(ms),
+            "mean": float(ms.mean()),
+            "p95": float(np.percentile(ms, 95)),
+            "max": float(ms.max()),
+        }
+
+    # ——— Sequencer thread ———
+    def _buzz(self, freq):
+        # freq None stops the buzzer; returns whether the call went through
+        try:
+            if freq is None:
+                self.buzzer.stop()
+            else:
+                self.buzzer.start(freq)
+        except Exception as error:
+            log.exception("buzzer %s failed", "stop" if freq is None else "start")
+            self.last_error = error
+            self.failed = True
+            return False
+        return True
+
+    def _timeline(self):
+        pattern = self._pattern
+        cycle = 0
+        while pattern.repeats is None or cycle < pattern.repeats:
+            base = self._start + cycle * pattern.period
+            for onset, stop, freq in pattern.steps:
+                yield base + onset, freq
+                yield base + stop, None
+            cycle += 1
+
+    def _apply(self, command, arg):
+        if command == "quit":
+            return False
+        self._buzz(None)
+        self._pattern, start = arg
+        if self._pattern is not None:
+            self._start = self.clock() if start is None else start
+            self._events = self._timeline()
+            self._next = next(self._events, None)
+        else:
+            self._next = None
+        return True
+
+    def _raise_priority(self):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        except (AttributeError, OSError):
+            pass
+
+    def run(self):
+        self._raise_priority()
+        running = True
+        while running:
+            timeout = None
+            if self._next is not None:
+                timeout = max(0.0, self._next[0] - self.clock() - _SPIN)
+            try:
+                command, arg = self._commands.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                running = self._apply(command, arg)
+                continue
+
+            deadline, freq = self._next
+            while self.clock() < deadline:
+                pass
+            if self._buzz(freq) and freq is not None:
+                self.onset_jitter.append(self.clock() - deadline)
+            self._next = next(self._events, None)
+        self._buzz(None)
+
+
+# Alarm priorities, highest wins
+LOW, MEDIUM, HIGH = range(3)
+
+
+class AlarmCondition:
+    def __init__(self, name, priority, pattern, data=None):
+        self.name = name
+        self.priority = priority
+        self.pattern = pattern
+        self.data = data  # whatever the UI shows for it, e.g. an image path
+        self.start = None  # clock time its pattern started, while it wins
+
+
+class AlarmManager:
+    """
+    Tracks concurrent alarm conditions and sounds the highest-priority one.
+
+    Conditions are keyed by name; raising a name again replaces it. The
+    winner's pattern is started on the sequencer from a start time chosen
+    here, and `phase(now)` reads the same timeline, so anything drawn from
+    it (the caution-image blink) stays locked to the buzzer. Conditions are
+    kept in one dict per priority level, so raising or clearing one is O(1)
+    and never blocks: the sequencer is only posted a command.
+
+    `on_change(condition)` is called with the new winner, or None, on the
+    thread that caused the change.
+    """
+
+    def __init__(self, sequencer, on_change=None):
+        self.sequencer = sequencer
+        self.on_change = on_change or (lambda condition: None)
+        self._levels = [{} for _ in range(HIGH + 1)]
+        self._active = None
+
+    @property
+    def active(self):
+        return self._active
+
+    def raise_alarm(self, name, priority, pattern, data=None):
+        current = self._levels[priority].get(name)
+        if current is not None and current.pattern is pattern:
+            return  # already raised; keep its phase
+        self.clear(name, notify=False)
+        self._levels[priority][name] = AlarmCondition(name, priority, pattern, data)
+        self._arbitrate()
+
+    def clear(self, name, notify=True):
+        for level in self._levels:
+            if level.pop(name, None) is not None:
+                break
+        if notify:
+            self._arbitrate()
+
+    def phase(self, now):
+        """(sounding, remaining) of the winning pattern at clock time `now`."""
+        if self._active is None:
+            return False, float("inf")
+        return self._active.pattern.phase(now - self._active.start)
+
+    def _arbitrate(self):
+        winner = None
+        for level in reversed(self._levels):
+            if level:
+                # Oldest condition within a level keeps the buzzer
+                winner = next(iter(level.values()))
+                break
+        if winner is self._active:
+            return
+        self._active = winner
+        if winner is None:
+            self.sequencer.silence()
+        else:
+            winner.start = self.sequencer.clock()
+            self.sequencer.play(winner.pattern, winner.start)
+        self.on_change(winner)
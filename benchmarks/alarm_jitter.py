@@ -0,0 +1,59 @@
+"""
+Beep onset jitter of the alarm sequencer while the UI thread is busy.
+
+Plays FULL_BLOCKAGE on a simulated buzzer from AlarmSequencer while the main
+thread renders large waveform windows back to back, the way a slow frame
+would, and prints how late each beep started against its deadline.
+
+    python benchmarks/alarm_jitter.py [--seconds S] [--samples N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarms import FULL_BLOCKAGE, AlarmSequencer  # noqa: E402
+from hal import SimulatedBuzzer  # noqa: E402
+from plotting import WaveformPlot  # noqa: E402
+from ringbuffer import RingBuffer  # noqa: E402
+
+
+def render_load(seconds, samples):
+    rng = np.random.default_rng(0)
+    buffer = RingBuffer(samples, rng.uniform(80, 120, samples))
+    plot = WaveformPlot()
+    frames = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        buffer.extend(rng.uniform(80, 120, 256))
+        # A fresh x0 each frame defeats the x-coordinate cache on purpose
+        plot.points(buffer, frames % 7, 900, 100, 20)
+        frames += 1
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--samples", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    sequencer = AlarmSequencer(SimulatedBuzzer())
+    sequencer.start()
+    sequencer.play(FULL_BLOCKAGE)
+    frames = render_load(args.seconds, args.samples)
+    sequencer.shutdown()
+
+    report = {"frames": frames, "onset_jitter_ms": sequencer.jitter_stats()}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Regression check: the vitals cards must not grow their canvases.
+
+Builds every vitals card, drives update_data/redraw for a long run and
+fails if the number of canvas instructions anywhere in a card's widget tree
+changes. Uses real Kivy graphics, so it needs a display (or a
+virtual one, e.g. xvfb-run).
+
+    python benchmarks/check_canvas_growth.py [ticks]
+"""
+
+import sys
+
+import headless
+
+
+def count_instructions(widget):
+    total = 0
+    for w in widget.walk(restrict=True):
+        for canvas in (w.canvas.before, w.canvas, w.canvas.after):
+            total += len(canvas.children)
+    return total
+
+
+def main(ticks=5000):
+    app = headless.load_main()
+
+    failed = False
+    for spec in app.VITALS:
+        card = app.VitalCard(**spec)
+        card.size = (800, 190)
+        now = card.stream.start
+        card.update_data(now)
+        card.redraw()
+        before = count_instructions(card)
+        for _ in range(ticks):
+            now += card.sample_interval
+            card.update_data(now)
+            card.redraw()
+        after = count_instructions(card)
+        status = "ok" if after == before else "GREW"
+        failed |= after != before
+        print(f"{spec['title']:<22} {before:>4} -> {after:<4} {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(a) for a in sys.argv[1:])))
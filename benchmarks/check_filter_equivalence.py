@@ -0,0 +1,85 @@
+"""
+Regression check: chunked filtering must match the plain recurrence.
+
+Runs noisy samples through every filter in filters.py, plus order-0
+(pure gain) and first-order LinearFilters, in chunks of several sizes
+(one sample, odd sizes straddling BLOCK, one large backlog), and fails
+unless each output matches y[n] = sum(b[k] x[n-k]) - sum(a[k] y[n-k])
+computed sample by sample from the same steady-state start.
+
+    python benchmarks/check_filter_equivalence.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filters import (  # noqa: E402
+    BLOCK,
+    BaselineFilter,
+    FIRLowPass,
+    LinearFilter,
+    LowPass,
+    Notch,
+)
+
+RATE = 250
+TOLERANCE = 1e-9
+
+
+def direct(b, a, x):
+    # The recurrence as written, starting as if x[0] had always been there
+    b = np.asarray(b, np.float64) / a[0]
+    a = np.asarray(a, np.float64) / a[0]
+    dc = b.sum() / a.sum() if a.sum() else 0.0
+    xs = [x[0]] * (len(b) - 1)
+    ys = [dc * x[0]] * (len(a) - 1)
+    out = np.empty(len(x))
+    for n, value in enumerate(x):
+        xs.insert(0, value)
+        y = sum(c * v for c, v in zip(b, xs))
+        y -= sum(c * v for c, v in zip(a[1:], ys))
+        out[n] = y
+        xs.pop()
+        ys.insert(0, y)
+        if len(ys) > len(a) - 1:
+            ys.pop()
+    return out
+
+
+def main():
+    filters = {
+        "gain": lambda: LinearFilter([1.0]),
+        "scaled_gain": lambda: LinearFilter([3.0], [2.0]),
+        "first_order": lambda: LinearFilter([0.2], [1.0, -0.8]),
+        "fir_lowpass_31": lambda: FIRLowPass(RATE, RATE / 8),
+        "iir_lowpass": lambda: LowPass(RATE, RATE / 8),
+        "baseline": lambda: BaselineFilter(RATE),
+        "notch_50hz": lambda: Notch(RATE, 50),
+    }
+    rng = np.random.default_rng(0)
+    t = np.arange(1000) / RATE
+    x = 94 + np.sin(2 * np.pi * 50 * t) + rng.normal(0, 1, len(t))
+
+    failed = False
+    for name, make in filters.items():
+        stage = make()
+        expected = direct(stage.b, stage.a, x)
+        errors = []
+        for size in (1, 7, BLOCK - 1, BLOCK + 1, len(x)):
+            stage = make()
+            got = np.concatenate(
+                [stage.process(x[i : i + size]) for i in range(0, len(x), size)]
+            )
+            errors.append(float(np.abs(got - expected).max()))
+        ok = max(errors) <= TOLERANCE
+        failed |= not ok
+        print(f"{name:<15} max error {max(errors):.1e} {'ok' if ok else 'WRONG'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
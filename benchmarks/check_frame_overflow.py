@@ -0,0 +1,45 @@
+"""
+Regression check: int16 frames must never carry wrapped values.
+
+Encodes values at and beyond the int16 range for a scale and fails unless
+the in-range ones round-trip through FrameReader and every out-of-range
+one (e.g. 400.0 at scale 0.01, which would wrap to -255.36) is refused
+by encode_frame.
+
+    python benchmarks/check_frame_overflow.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol import INT16, FrameReader, encode_frame  # noqa: E402
+
+SCALE = 0.01
+
+
+def main():
+    failed = False
+    for value in (0.0, 327.67, -327.68, 120.5):
+        reader = FrameReader()
+        reader.feed(encode_frame(0, 0.0, 0.01, [value], INT16, SCALE))
+        ((_, _, values),) = reader.parse()
+        ok = abs(values[0] - value) <= SCALE / 2
+        failed |= not ok
+        print(f"{value:>9} -> {values[0]:<9.2f} {'ok' if ok else 'WRONG'}")
+    for value in (400.0, 327.68, -327.69, np.nan):
+        try:
+            encode_frame(0, 0.0, 0.01, [1.0, value], INT16, SCALE)
+        except ValueError:
+            print(f"{value:>9} -> refused  ok")
+        else:
+            failed = True
+            print(f"{value:>9} -> encoded  WRAPPED")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Cost and latency of the alarm detection rules.
+
+Feeds synthetic RR, ETCO2, SpO2 and HR waveforms through AlarmDetector in
+per-frame chunks at 60 frames/s, the way VitalCard.update_data does. Each
+waveform goes abnormal once (flat respiration, flat capnogram, SpO2 85 %,
+HR 130) for `--event` seconds, staggered so they do not overlap. Reports
+the CPU cost per second of data overall and for each rule, the latter
+timed on a second, fresh set of rules each in a detector of its own (so
+it includes that detector's small per-feed overhead), and for each
+rule how long after its own delay or window it fired (never more than one
+frame's chunk; negative when the waveform was already flat just before the
+onset) and how long after the event ended it cleared.
+
+    python benchmarks/detection_cost.py [--rate HZ] [--seconds S] [--event S]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection import AlarmDetector, default_rules  # noqa: E402
+
+FRAME = 1 / 60
+RR, ETCO2, SPO2, HR = range(4)
+
+
+def waveform(channel, t, onset, event):
+    abnormal = (t >= onset) & (t < onset + event)
+    if channel == RR:
+        normal = 16 + 4 * np.sin(2 * np.pi * t / 4)
+        return np.where(abnormal, 16.0, normal)
+    if channel == ETCO2:
+        normal = np.where(t % 4 < 2.5, 38.0, 0.0)
+        return np.where(abnormal, 0.0, normal)
+    if channel == SPO2:
+        return np.where(abnormal, 85.0, 97.0)
+    return np.where(abnormal, 130.0, 80.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=250, help="samples/s/channel")
+    parser.add_argument("--seconds", type=float, default=300)
+    parser.add_argument("--event", type=float, default=40, help="abnormal seconds")
+    args = parser.parse_args(argv)
+
+    now = 0.0
+    changes = []
+    rules = default_rules(rr=RR, etco2=ETCO2, spo2=SPO2, hr=HR)
+    detector = AlarmDetector(
+        rules,
+        on_change=lambda rule, active: changes.append((rule.name, active, now)),
+        clock=lambda: now,
+    )
+    # The same rules again, fresh, one detector each, to time them apart
+    timed = {
+        rule.name: (rule.channel, AlarmDetector([rule], clock=lambda: now))
+        for rule in default_rules(rr=RR, etco2=ETCO2, spo2=SPO2, hr=HR)
+    }
+    onsets = {RR: 30.0, ETCO2: 100.0, SPO2: 170.0, HR: 240.0}
+    # What each rule needs to see before it may fire
+    holds = {
+        rule.name: getattr(rule, "delay", getattr(rule, "window", 0)) for rule in rules
+    }
+
+    cost = {rule.name: 0.0 for rule in rules}
+    total = 0.0
+    frames = int(args.seconds / FRAME)
+    per_frame = args.rate * FRAME
+    carry = 0.0
+    sample = 0
+    for _ in range(frames):
+        now += FRAME
+        carry += per_frame
+        n = int(carry)
+        carry -= n
+        if not n:
+            continue
+        times = (sample + np.arange(n)) / args.rate
+        sample += n
+        for channel in range(4):
+            values = waveform(channel, times, onsets[channel], args.event)
+            t0 = time.perf_counter()
+            detector.feed(channel, times, values)
+            total += time.perf_counter() - t0
+            for name, (watched, single) in timed.items():
+                if watched == channel:
+                    t0 = time.perf_counter()
+                    single.feed(channel, times, values)
+                    cost[name] += time.perf_counter() - t0
+
+    channel_of = {rule.name: rule.channel for rule in rules}
+    events = {}
+    for name, active, at in changes:
+        onset = onsets[channel_of[name]]
+        key = "fire_lag_s" if active else "clear_after_s"
+        base = onset + holds[name] if active else onset + args.event
+        events.setdefault(name, {})[key] = round(at - base, 3)
+
+    report = {
+        "rate_hz": args.rate,
+        "seconds": args.seconds,
+        "us_per_data_second": round(total / args.seconds * 1e6, 2),
+        "rule_us_per_data_second": {
+            name: round(spent / args.seconds * 1e6, 2) for name, spent in cost.items()
+        },
+        "events": events,
+        "worst_latency_s": round(detector.worst_latency, 4),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Cost per 1,000 samples of each streaming filter.
+
+Runs noisy samples through every filter in filters.py, and through the
+chain the app puts on a sensor channel, in chunks of several sizes: one
+frame's worth at `--rate` (how the app calls them), one BLOCK and a large
+backlog. Reports microseconds per 1,000 samples and per call.
+
+    python benchmarks/filter_cost.py [--rate HZ] [--samples N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filters import (  # noqa: E402
+    BLOCK,
+    BaselineFilter,
+    FilterChain,
+    FIRLowPass,
+    LowPass,
+    Notch,
+)
+
+FRAME = 1 / 60
+
+
+def filters(rate):
+    return {
+        "fir_lowpass_31": lambda: FIRLowPass(rate, rate / 8),
+        "iir_lowpass": lambda: LowPass(rate, rate / 8),
+        "baseline": lambda: BaselineFilter(rate),
+        "notch_50hz": lambda: Notch(rate, 50),
+        # What main.sensor_filters builds at this rate
+        "sensor_chain": lambda: FilterChain(Notch(rate, 50), LowPass(rate, rate / 4)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=250, help="samples/s")
+    parser.add_argument("--samples", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    t = np.arange(args.samples) / args.rate
+    rng = np.random.default_rng(0)
+    values = 94 + np.sin(2 * np.pi * 50 * t) + rng.normal(0, 1, args.samples)
+    chunks = sorted({max(1, round(args.rate * FRAME)), BLOCK, 4096})
+
+    report = {"rate_hz": args.rate, "samples": args.samples, "filters": {}}
+    for name, make in filters(args.rate).items():
+        results = {}
+        for size in chunks:
+            stage = make()
+            t0 = time.perf_counter()
+            for i in range(0, args.samples, size):
+                stage.process(values[i : i + size])
+            spent = time.perf_counter() - t0
+            calls = -(-args.samples // size)
+            results[f"chunk_{size}"] = {
+                "us_per_1000": round(spent / args.samples * 1e9, 1),
+                "us_per_call": round(spent / calls * 1e6, 2),
+            }
+        report["filters"][name] = results
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
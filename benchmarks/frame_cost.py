@@ -0,0 +1,148 @@
+"""
+Headless per-frame cost of the vitals components.
+
+Builds a VitalCard for each entry in main.VITALS with the simulated buzzer
+and, by default, GL-backed graphics stubbed (see headless.py), then drives
+update_data and redraw at 60 frames/s of simulated time across a matrix of
+sample rates and window lengths. Reports p50/p95/p99 milliseconds per
+frame for each phase and the memory allocated per frame, as JSON, so runs
+can be compared between releases.
+
+    python benchmarks/frame_cost.py [--frames N] [--graphics stub|kivy]
+                                    [--mode scroll|sweep]
+                                    [--output results.json]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import headless
+import numpy as np
+from headless import summarize
+
+FRAME = 1 / 60
+RATES = (20, 100, 250)  # samples per second
+WINDOWS = (2, 10)  # seconds of samples on screen
+
+
+def build(app, spec, rate, window, mode):
+    from ringbuffer import RingBuffer
+    from streams import RandomSamples, SyntheticStream
+
+    capacity = int(rate * window)
+    source = spec["source"]
+    if callable(source):
+        source = RandomSamples(80, 93)
+        initial = source(capacity)
+    else:
+        initial = np.resize(np.asarray(source, dtype=float), capacity)
+    spec = dict(spec, source=source, sample_interval=1 / rate, mode=mode)
+    spec.update(capacity=capacity, initial=initial)
+    card = app.VitalCard(size_hint=(None, None), size=(960, 190), **spec)
+    # Simulated time starts at 0 so every run sees the same sample stamps
+    card.stream = SyntheticStream(rate, source, start=0.0)
+    card.time_buffer = RingBuffer(capacity, card.stream.history(capacity))
+    return card
+
+
+def run_frames(comp, frames, now):
+    phases = {"update_data": [], "redraw": [], "frame": []}
+    for _ in range(frames):
+        now += FRAME
+        t0 = time.perf_counter()
+        comp.update_data(now)
+        t1 = time.perf_counter()
+        comp.redraw()
+        t2 = time.perf_counter()
+        phases["update_data"].append(t1 - t0)
+        phases["redraw"].append(t2 - t1)
+        phases["frame"].append(t2 - t0)
+    return phases, now
+
+
+def measure_allocations(comp, frames, now):
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    for _ in range(frames):
+        now += FRAME
+        before_blocks = sys.getallocatedblocks()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        comp.update_data(now)
+        comp.redraw()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - current)
+        blocks.append(sys.getallocatedblocks() - before_blocks)
+    tracemalloc.stop()
+    return peaks, blocks, now
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--graphics", choices=("stub", "kivy"), default="stub")
+    parser.add_argument("--mode", choices=("scroll", "sweep"), default="scroll")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    app = headless.load_main(stub_graphics=args.graphics == "stub")
+
+    results = []
+    for spec in app.VITALS:
+        name = spec["title"].rstrip(" :")
+        for rate in RATES:
+            for window in WINDOWS:
+                comp = build(app, spec, rate, window, args.mode)
+                now = comp.stream.start
+                _, now = run_frames(comp, 30, now)  # warm-up
+                phases, now = run_frames(comp, args.frames, now)
+                peaks, blocks, now = measure_allocations(
+                    comp, min(args.frames, 200), now
+                )
+                row = {
+                    "component": name,
+                    "rate_hz": rate,
+                    "window_s": window,
+                    "buffer": comp.data_buffer.capacity,
+                    "ms": {name: summarize(v) for name, v in phases.items()},
+                    "alloc_peak_bytes": summarize(peaks, scale=1),
+                    "net_blocks_per_frame": round(float(np.mean(blocks)), 2),
+                }
+                results.append(row)
+                frame = row["ms"]["frame"]
+                print(
+                    f"{name:<22}{rate:>5} Hz{window:>4} s  "
+                    f"p50 {frame['p50']:.3f}  p95 {frame['p95']:.3f}  "
+                    f"p99 {frame['p99']:.3f} ms",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "graphics": args.graphics,
+            "mode": args.mode,
+            "frames": args.frames,
+            "frame_interval_s": FRAME,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Throughput of the binary sensor frame parser, and a pty loopback check.
+
+Encodes frames for four channels, corrupts one byte in every hundredth,
+and feeds the stream to FrameReader in 4 KiB reads the way FrameReceiver
+does. Reports MB/s and samples/s parsed for small (one 20 ms batch at
+250 Hz) and large frames of both payload kinds, and the errors counted.
+Then runs SimulatedSensorLink into a FrameReceiver over a real pty for
+`--seconds` and checks every sample came back.
+
+    python benchmarks/frame_parse.py [--frames N] [--seconds S]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol import (  # noqa: E402
+    FLOAT32,
+    INT16,
+    FrameReader,
+    FrameReceiver,
+    SimulatedSensorLink,
+    encode_frame,
+    open_serial,
+)
+from streams import SyntheticStream  # noqa: E402
+
+READ_SIZE = 4096
+
+
+def parse_cost(frames, samples, kind):
+    rng = np.random.default_rng(0)
+    parts = []
+    for i in range(frames):
+        values = rng.uniform(0, 100, samples)
+        frame = bytearray(encode_frame(i % 4, i, 0.004, values, kind, 0.01, i // 4))
+        if i % 100 == 99:
+            frame[-5] ^= 0xFF
+        parts.append(bytes(frame))
+    stream = b"".join(parts)
+
+    reader = FrameReader()
+    parsed = 0
+    t0 = time.perf_counter()
+    for i in range(0, len(stream), READ_SIZE):
+        reader.feed(stream[i : i + READ_SIZE])
+        for _, _, values in reader.parse():
+            parsed += len(values)
+    spent = time.perf_counter() - t0
+    return {
+        "bytes": len(stream),
+        "mb_per_s": round(len(stream) / spent / 1e6, 1),
+        "samples_per_s": round(parsed / spent),
+        "us_per_frame": round(spent / frames * 1e6, 2),
+        "crc_errors": reader.crc_errors,
+        "lost": reader.lost,
+    }
+
+
+def loopback(seconds):
+    source = np.arange(500) * 0.25
+    rates = {0: 20, 1: 20, 2: 250}
+    link = SimulatedSensorLink(
+        {channel: SyntheticStream(rate, source) for channel, rate in rates.items()}
+    )
+    receiver = FrameReceiver(open_serial(link.port))
+    queues = {channel: receiver.add(channel) for channel in rates}
+    receiver.start()
+    link.start()
+    time.sleep(seconds)
+    link.stop()
+    receiver.stop()
+
+    report = {}
+    for channel, queue in queues.items():
+        times, values = queue.read()
+        expected = source[np.arange(len(values)) % len(source)]
+        report[channel] = {
+            "samples": len(values),
+            "max_error": round(float(np.abs(values - expected).max()), 6),
+            "even_spacing": bool(np.allclose(np.diff(times), 1 / rates[channel])),
+        }
+    report["lost"] = receiver.reader.lost
+    report["crc_errors"] = receiver.reader.crc_errors
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    report = {"parse": {}}
+    for name, kind in (("int16", INT16), ("float32", FLOAT32)):
+        for samples in (5, 256):
+            key = f"{name}_{samples}_samples"
+            report["parse"][key] = parse_cost(args.frames, samples, kind)
+    report["pty_loopback"] = loopback(args.seconds)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Helpers for building the vitals UI without a Raspberry Pi or a display.
+
+`load_main()` imports main.py with the simulated buzzer backend. With
+`stub_graphics=True` it also swaps the GL-backed pieces main.py, digits.py
+and vitals.py draw with (vertex instructions, images, icon textures, text
+rendering) for plain Python stand-ins, so components can be built and driven
+on a box with no GL context at all. Stubs keep the attribute assignments the
+real instructions receive (Line.points copies into a list, as Kivy does),
+but not the GPU-side work.
+
+`summarize()` is the percentile summary the benchmarks report timings in.
+"""
+
+import os
+import sys
+import types
+
+import numpy as np
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_LOG_MODE", "PYTHON")
+os.environ.setdefault("BUZZER_BACKEND", "sim")
+# dp()/sp() otherwise ask the window for its DPI, which opens one
+os.environ.setdefault("KIVY_DPI", "96")
+os.environ.setdefault("KIVY_METRICS_DENSITY", "1")
+os.environ.setdefault("KIVY_METRICS_FONTSCALE", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubInstruction:
+    """Records whatever a vertex instruction would have been given."""
+
+    def __init__(self, **kwargs):
+        self.points = []
+        self.texture = None
+        self.__dict__.update(kwargs)
+
+    def __setattr__(self, name, value):
+        if name == "points":
+            value = list(value)
+        object.__setattr__(self, name, value)
+
+
+class StubTexture:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = (width, height)
+
+
+def _stub_widget(base):
+    from kivy.properties import ObjectProperty
+
+    class Stub(base):
+        text_size = ObjectProperty(None, allownone=True)
+
+        def __init__(self, **kwargs):
+            for name in ("source", "texture", "text", "markup", "font_name"):
+                kwargs.pop(name, None)
+            for name in ("font_size", "color", "halign", "valign", "padding"):
+                kwargs.pop(name, None)
+            for name in ("allow_stretch", "keep_ratio", "fit_mode"):
+                kwargs.pop(name, None)
+            super().__init__(**kwargs)
+
+        def reload(self):
+            pass
+
+    return Stub
+
+
+def install_stub_window():
+    # Widget.__init__ insists on a window; give it one that never opens
+    from kivy.base import EventLoop
+    from kivy.event import EventDispatcher
+
+    class StubWindow(EventDispatcher):
+        width, height = 1280, 800
+        size = (width, height)
+        dpi = 96
+
+    window = StubWindow()
+    module = types.ModuleType("kivy.core.window")
+    module.Window = window
+    module.WindowBase = StubWindow
+    sys.modules["kivy.core.window"] = module
+    EventLoop.set_window(window)
+
+
+def load_main(stub_graphics=False):
+    if stub_graphics:
+        install_stub_window()
+    import main
+
+    if stub_graphics:
+        import digits
+        import vitals
+        from kivy.uix.widget import Widget
+
+        for module in (main, digits, vitals):
+            for name in ("Line", "Rectangle", "RoundedRectangle", "Mesh"):
+                if hasattr(module, name):
+                    setattr(module, name, StubInstruction)
+        main.Image = _stub_widget(Widget)
+        main.Label = _stub_widget(Widget)
+        glyphs = {ch: StubTexture(20, 40) for ch in digits.GLYPHS}
+        digits.digit_glyphs = lambda font_name, font_size: glyphs
+        vitals.label_texture = lambda text, font_name, font_size: StubTexture(
+            7 * len(text), 17
+        )
+        icons = {}
+        main.icon_texture = vitals.icon_texture = lambda path: icons.setdefault(
+            path, StubTexture(89, 87)
+        )
+    return main
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(samples, scale=1000.0):
+    """p50/p95/p99 of `samples` times `scale` (seconds to ms by default)."""
+    values = np.percentile(np.asarray(samples) * scale, PERCENTILES)
+    return {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, values)}
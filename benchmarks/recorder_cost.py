@@ -0,0 +1,100 @@
+"""
+Cost of recording vitals with TrendRecorder.
+
+Appends per-frame batches for every channel, the way VitalCard.update_data
+does at 60 frames/s, and reports the cost per record() call and per sample.
+Flushes run every 5 s of simulated time, inline rather than on the flush
+thread so the run is not paced in real time, and their msync cost is
+reported separately. With --pyramid the recorder also feeds a
+TrendPyramid, as the app does.
+
+    python benchmarks/recorder_cost.py [--rate HZ] [--seconds S] [--dir PATH]
+                                        [--pyramid]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless import summarize  # noqa: E402
+from recorder import TrendRecorder  # noqa: E402
+from trends import TrendPyramid  # noqa: E402
+
+FRAME = 1 / 60
+FLUSH_INTERVAL = 5.0
+CHANNELS = 4
+
+
+def record(args, directory):
+    # Small segments so rotation shows up too
+    pyramid = TrendPyramid(directory, CHANNELS) if args.pyramid else None
+    recorder = TrendRecorder(directory, segment_records=1 << 16, pyramid=pyramid)
+    recorder.flush()  # prepares the first spare segment, as the thread would
+
+    per_frame = args.rate * FRAME
+    frames = int(args.seconds / FRAME)
+    calls = []
+    flushes = []
+    next_flush = FLUSH_INTERVAL
+    samples = 0
+    rng = np.random.default_rng(0)
+    now = 0.0
+    carry = 0.0
+    for _ in range(frames):
+        carry += per_frame
+        n = int(carry)
+        carry -= n
+        times = now + np.arange(n) / args.rate
+        now += FRAME
+        for channel in range(CHANNELS):
+            values = rng.uniform(80, 100, n)
+            t0 = time.perf_counter()
+            recorder.record(channel, times, values)
+            calls.append(time.perf_counter() - t0)
+            samples += n
+        if now >= next_flush:
+            next_flush += FLUSH_INTERVAL
+            t0 = time.perf_counter()
+            recorder.flush()
+            flushes.append(time.perf_counter() - t0)
+    recorder.close()
+
+    return {
+        "rate_hz": args.rate,
+        "channels": CHANNELS,
+        "pyramid": args.pyramid,
+        "samples": samples,
+        "record_call_us": summarize(calls, 1e6),
+        "ns_per_sample": round(sum(calls) / max(1, samples) * 1e9, 1),
+        "flush_ms": summarize(flushes or [0.0], 1e3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=250, help="samples/s/channel")
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--dir", help="segment directory (default: a temp dir)")
+    parser.add_argument("--pyramid", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Segments go to --dir and are kept, or to a temp dir removed afterwards
+    if args.dir:
+        report = record(args, args.dir)
+        report["directory"] = args.dir
+    else:
+        with tempfile.TemporaryDirectory(prefix="trends-") as directory:
+            report = record(args, directory)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Soak test: replay a high-rate session through the vitals cards.
+
+Synthesizes a session with every VITALS waveform at --rate Hz (or uses
+--session, a recorded trend directory), replays it at --speed through
+SessionReplay into headless VitalCards (see headless.py) and runs the real
+FrameScheduler at 60 frames/s of wall-clock time for --seconds. Reports
+per-frame cost, scheduler overruns and catch-ups, and batches the queues
+had to drop.
+
+    python benchmarks/replay_soak.py [--rate HZ] [--speed X] [--seconds S]
+                                     [--session DIR]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import headless
+from headless import summarize
+
+FRAME = 1 / 60
+
+
+def soak(app, args, session):
+    from replay import SessionReplay
+    from scheduler import FrameScheduler
+
+    replay = SessionReplay(session, speed=args.speed)
+    scheduler = FrameScheduler(budget=FRAME)
+    cards = []
+    for spec in app.VITALS:
+        card = app.VitalCard(size_hint=(None, None), size=(960, 190), **spec)
+        card.stream = replay.add(card.channel)
+        scheduler.add(card)
+        cards.append(card)
+    replay.start()
+
+    frames = []
+    deadline = time.perf_counter()
+    end = deadline + args.seconds
+    while deadline < end:
+        deadline += FRAME
+        t0 = time.perf_counter()
+        scheduler.tick(FRAME)
+        frames.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    replay.stop()
+
+    return {
+        "speed": args.speed,
+        "frames": scheduler.frames,
+        "frame_ms": summarize(frames),
+        "overruns": scheduler.overruns,
+        "catch_ups": scheduler.catch_ups,
+        "dropped_batches": sum(card.stream.dropped for card in cards),
+        "samples_shown": int(sum(card.data_buffer.count for card in cards)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=250)
+    parser.add_argument("--speed", type=float, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--session")
+    args = parser.parse_args(argv)
+
+    app = headless.load_main(stub_graphics=True)
+    from replay import synthesize_session
+
+    if args.session:
+        report = soak(app, args, args.session)
+        report["session"] = args.session
+    else:
+        # A synthesized session lives in a temp dir removed afterwards
+        with tempfile.TemporaryDirectory(prefix="session-") as session:
+            channels = {
+                spec["channel"]: (args.rate, spec["source"]) for spec in app.VITALS
+            }
+            # Enough recorded time to keep playing for the whole run
+            synthesize_session(session, channels, args.seconds * args.speed + 60)
+            report = soak(app, args, session)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Press-to-display latency of the blockage status buttons.
+
+Builds SidebarPanel and times `_on_status_press` through to the caution
+image holding its new texture, cycling Full, Partial and No blockage. For
+comparison it also times decoding the same PNG from disk, which is what
+the old reload() path paid on every press before any GPU upload.
+
+By default the panel is built headless (see headless.py), which stubs
+`icon_texture` along with the other GL-backed pieces: the press then
+swaps placeholder objects, so the figures cover the Python path only,
+not assigning a real Texture to the Image. With `--real-textures` it
+uses real Kivy graphics and the icons preloaded as the app does, which
+needs a display (or a virtual one, e.g. xvfb-run). Either way the GPU
+upload happens when the next frame is drawn, outside the timed press.
+
+    python benchmarks/status_latency.py [--presses N] [--real-textures]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import headless
+from headless import summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--presses", type=int, default=300)
+    parser.add_argument("--real-textures", action="store_true")
+    args = parser.parse_args(argv)
+
+    app = headless.load_main(stub_graphics=not args.real_textures)
+    from kivy.core.image import ImageLoader
+
+    if args.real_textures:
+        app.preload_icons()
+
+    panel = app.SidebarPanel()
+    presses = [
+        ("full", "Full\nblockage", "assets/full.png"),
+        ("partial", "Partial\nblockage", "assets/partial.png"),
+        ("no", "No\nblockage", "assets/no.png"),
+    ]
+
+    press, decode = [], []
+    for i in range(args.presses):
+        status, label, path = presses[i % len(presses)]
+        t0 = time.perf_counter()
+        panel._on_status_press(status, label)
+        press.append(time.perf_counter() - t0)
+        assert panel._caution_image.texture is app.icon_texture(path)
+
+        t0 = time.perf_counter()
+        ImageLoader.load(path, nocache=True)
+        decode.append(time.perf_counter() - t0)
+    panel.sequencer.shutdown()
+
+    report = {
+        "presses": args.presses,
+        "textures": "real" if args.real_textures else "stubbed",
+        "press_to_texture_ms": summarize(press),
+        "png_decode_ms": summarize(decode),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Time to fetch 1 h, 8 h and 24 h trends from a TrendPyramid.
+
+Fills a pyramid in a temporary directory with a day of synthetic samples
+at --rate Hz for one channel, then times `view()` for each range at the
+given trend width, which should stay flat however long the range is.
+
+    python benchmarks/trend_view.py [--rate HZ] [--pixels N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trends import TrendPyramid  # noqa: E402
+
+RANGES = {"1h": 3600, "8h": 8 * 3600, "24h": 24 * 3600}
+REPEATS = 200
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=4)
+    parser.add_argument("--pixels", type=int, default=600)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="pyramid-") as directory:
+        pyramid = TrendPyramid(directory, channels=1)
+        rng = np.random.default_rng(0)
+        end = 24 * 3600.0
+        t0 = time.perf_counter()
+        for minute in range(int(end // 60)):
+            times = minute * 60 + np.arange(int(60 * args.rate)) / args.rate
+            pyramid.add(0, times, rng.normal(95, 2, len(times)))
+        fill = time.perf_counter() - t0
+
+        report = {"rate_hz": args.rate, "fill_s": round(fill, 3), "views": {}}
+        for name, span in RANGES.items():
+            t0 = time.perf_counter()
+            for _ in range(REPEATS):
+                width, buckets = pyramid.view(0, end - span, end, args.pixels)
+            elapsed = (time.perf_counter() - t0) / REPEATS
+            report["views"][name] = {
+                "tier_s": width,
+                "buckets": len(buckets),
+                "ms": round(elapsed * 1000, 4),
+            }
+        pyramid.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: UI frame time with acquisition in-process vs in a worker process.
+
+Emulates the UI loop without Kivy: every frame each channel drains its
+queue, appends to its RingBuffers and builds graph vertices. Acquisition
+runs either on threads in this process (Acquisition) or in a worker
+process writing to shared memory (SharedMemoryPipeline). Each source does
+some per-sample pure-Python processing to stand in for DSP, which is what
+competes with the UI for the GIL.
+
+    python benchmarks/worker_process.py [seconds] [rate]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from acquisition import Acquisition, SimulatedSource  # noqa: E402
+from plotting import WaveformPlot  # noqa: E402
+from ringbuffer import RingBuffer  # noqa: E402
+from shm_pipeline import SharedMemoryPipeline  # noqa: E402
+from streams import SyntheticStream  # noqa: E402
+
+FRAME = 1 / 60
+CHANNELS = 4
+WINDOW = 10  # seconds of samples kept per channel
+
+
+class ProcessedSource(SimulatedSource):
+    """SimulatedSource plus a per-sample Python filter standing in for DSP."""
+
+    def __init__(self, stream, taps=64):
+        super().__init__(stream)
+        self.taps = taps
+        self._history = [0.0] * taps
+
+    def read(self):
+        times, values = super().read()
+        history = self._history
+        out = []
+        for value in values.tolist():
+            history.pop(0)
+            history.append(value)
+            out.append(sum(history) / self.taps)
+        return times, np.asarray(out)
+
+
+def run(mode, seconds, rate):
+    pipeline = SharedMemoryPipeline() if mode == "worker" else Acquisition()
+    waveform = 94 + 4 * np.sin(np.linspace(0, 2 * np.pi, 250))
+    capacity = int(WINDOW * rate)
+    channels = []
+    for _ in range(CHANNELS):
+        stream = SyntheticStream(rate, waveform)
+        queue = pipeline.add(ProcessedSource(stream))
+        channels.append(
+            (queue, RingBuffer(capacity), RingBuffer(capacity), WaveformPlot())
+        )
+    pipeline.start()
+    time.sleep(0.5)  # let the worker come up before measuring
+
+    frame_times = []
+    end = time.perf_counter() + seconds
+    deadline = time.perf_counter()
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        for queue, data, stamps, plot in channels:
+            times, values = queue.read(time.monotonic())
+            stamps.extend(times)
+            data.extend(values)
+            if len(data):
+                plot.points(data, 0, 400, 100, 20, times=stamps, span=WINDOW)
+        frame_times.append(time.perf_counter() - start)
+        deadline += FRAME
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    pipeline.stop()
+    return np.array(frame_times) * 1000
+
+
+def main(seconds=10, rate=250):
+    print(f"{CHANNELS} channels at {rate} Hz, {seconds} s per mode, 60 fps")
+    print(f"{'mode':<10}{'frames':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for mode in ("threads", "worker"):
+        ms = run(mode, float(seconds), float(rate))
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"{mode:<10}{len(ms):>8}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,101 @@
+from collections import deque
+
+import numpy as np
+
+
+class BreathDetector:
+    """
+    Finds breaths in a streaming capnogram.
+
+    Expiration starts when CO2 rises through `rise` and ends when it falls
+    back through `fall` (a lower level, so noise on the upstroke cannot
+    split a breath). Each completed breath yields (start time, end-tidal
+    CO2, interval): the peak CO2 of the expiration and the time since the
+    previous breath started, or None for the first.
+
+    `update(times, values)` takes one chunk of samples; state carries over
+    between chunks, so each sample is looked at once and the buffer is
+    never rescanned. `end_tidal()` and `rate()` are means over the last
+    `average` breaths, kept as running sums; both drop to 0 once no
+    breath has started for `stale` seconds of samples.
+    """
+
+    def __init__(self, rise=10.0, fall=5.0, average=4, stale=20.0):
+        self.rise = rise
+        self.fall = fall
+        self.stale = stale
+        self._expiring = False
+        self._start = None  # start of the expiration in progress
+        self._last_start = None  # start of the last completed breath
+        self._peak = -np.inf
+        self._now = None
+        self._peaks = deque(maxlen=average)
+        self._intervals = deque(maxlen=average)
+        self._peak_sum = 0.0
+        self._interval_sum = 0.0
+
+    def update(self, times, values):
+        """Fold in a chunk; return the breaths it completed."""
+        n = len(values)
+        if not n:
+            return []
+        self._now = times[-1]
+        # Hysteresis without a per-sample loop: a sample past either level
+        # sets the phase and every other sample keeps the last one set
+        level = np.full(n, -1, np.int8)
+        level[values >= self.rise] = 1
+        level[values <= self.fall] = 0
+        set_at = np.where(level >= 0, np.arange(n), -1)
+        np.maximum.accumulate(set_at, out=set_at)
+        phase = np.where(set_at >= 0, level[set_at], int(self._expiring))
+        edges = np.flatnonzero(np.diff(phase, prepend=int(self._expiring)))
+
+        breaths = []
+        begin = 0
+        for edge in edges:
+            if self._expiring:
+                self._peak = max(self._peak, values[begin:edge].max(initial=-np.inf))
+                breaths.append(self._complete())
+            else:
+                self._start = times[edge]
+            self._expiring = not self._expiring
+            begin = edge
+        if self._expiring:
+            self._peak = max(self._peak, values[begin:].max())
+        return breaths
+
+    def _complete(self):
+        interval = None
+        if self._last_start is not None:
+            interval = float(self._start - self._last_start)
+            if len(self._intervals) == self._intervals.maxlen:
+                self._interval_sum -= self._intervals[0]
+            self._intervals.append(interval)
+            self._interval_sum += interval
+        if len(self._peaks) == self._peaks.maxlen:
+            self._peak_sum -= self._peaks[0]
+        self._peaks.append(self._peak)
+        self._peak_sum += self._peak
+        breath = (float(self._start), float(self._peak), interval)
+        self._last_start = self._start
+        self._peak = -np.inf
+        return breath
+
+    def _stale(self):
+        return self._start is not None and self._now - self._start > self.stale
+
+    def end_tidal(self):
+        """Mean end-tidal CO2 of the recent breaths, or None before any."""
+        if self._stale():
+            return 0
+        if not self._peaks:
+            return None
+        return self._peak_sum / len(self._peaks)
+
+    def rate(self):
+        """Breaths per minute over the recent breaths, or None before two."""
+        if self._stale():
+            return 0
+        if not self._intervals:
+            return None
+        return 60 * len(self._intervals) / self._interval_sum
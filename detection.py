@@ -0,0 +1,186 @@
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Rule:
+    """
+    One alarm condition on one channel, evaluated a chunk at a time.
+
+    `update(times, values)` folds a chunk of samples into the rule's state
+    and returns True when the rule starts firing, False when it stops, and
+    None otherwise. `tick(now)` does the same between chunks, for rules
+    that must fire on a channel that has stopped sending. `status` names
+    what the UI shows while it fires.
+    """
+
+    def __init__(self, name, channel, status):
+        self.name = name
+        self.channel = channel
+        self.status = status
+        self.active = False
+
+    def update(self, times, values):
+        raise NotImplementedError
+
+    def tick(self, now):
+        return None
+
+    def _set(self, active):
+        if active == self.active:
+            return None
+        self.active = active
+        return active
+
+
+class SustainedRule(Rule):
+    """
+    Fires once values stay past `on` for `delay` seconds and clears once
+    they stay back past `off` for `delay` seconds. `above` says which side
+    is abnormal; `off` sits inside `on` to give hysteresis.
+    """
+
+    def __init__(self, name, channel, status, on, off, delay, above):
+        super().__init__(name, channel, status)
+        self.on = on
+        self.off = off
+        self.delay = delay
+        self.above = above
+        self._since = None  # start of the current run towards a change
+
+    def update(self, times, values):
+        if self.active:
+            toward = values < self.off if self.above else values > self.off
+        else:
+            toward = values > self.on if self.above else values < self.on
+        # Only the run at the end of the chunk matters
+        breaks = np.flatnonzero(~toward)
+        if len(breaks) == 0:
+            if self._since is None:
+                self._since = times[0]
+        elif breaks[-1] == len(values) - 1:
+            self._since = None
+        else:
+            self._since = times[breaks[-1] + 1]
+        if self._since is not None and times[-1] - self._since >= self.delay:
+            self._since = None
+            return self._set(not self.active)
+        return None
+
+
+class WindowRule(Rule):
+    """
+    Watches the extremes of the last `window` seconds.
+
+    With `measure="max"` it fires when the window's maximum is below `on`
+    (a signal that has gone flat low); with `measure="range"` when its
+    peak-to-peak range is below `on` (a signal that has stopped moving).
+    It clears once the measure reaches `off`. Each chunk is summarized by
+    its min and max and kept in monotonic deques, so an update costs O(1)
+    amortized whatever the window length. A window with no samples at all,
+    i.e. `window` seconds past the last sample (or since the first tick,
+    if none ever came), counts as flat and fires on `tick(now)`.
+    """
+
+    def __init__(self, name, channel, status, on, off, window, measure):
+        super().__init__(name, channel, status)
+        self.on = on
+        self.off = off
+        self.window = window
+        self.measure = measure
+        self._maxs = deque()  # (time, max), maxima decreasing
+        self._mins = deque()  # (time, min), minima increasing
+        self._first = None
+
+    def update(self, times, values):
+        now = times[-1]
+        if self._first is None:
+            self._first = times[0]
+        hi = float(values.max())
+        lo = float(values.min())
+        while self._maxs and self._maxs[-1][1] <= hi:
+            self._maxs.pop()
+        self._maxs.append((now, hi))
+        while self._mins and self._mins[-1][1] >= lo:
+            self._mins.pop()
+        self._mins.append((now, lo))
+        horizon = now - self.window
+        while self._maxs[0][0] < horizon:
+            self._maxs.popleft()
+        while self._mins[0][0] < horizon:
+            self._mins.popleft()
+
+        if now - self._first < self.window:
+            return None  # not a full window yet
+        value = self._maxs[0][1]
+        if self.measure == "range":
+            value -= self._mins[0][1]
+        if self.active:
+            return self._set(value < self.off)
+        return self._set(value < self.on)
+
+    def tick(self, now):
+        if self._first is None:
+            self._first = now
+        horizon = now - self.window
+        # The newest chunk is last in both deques, so they empty together
+        while self._maxs and self._maxs[0][0] < horizon:
+            self._maxs.popleft()
+        while self._mins and self._mins[0][0] < horizon:
+            self._mins.popleft()
+        if self._maxs or now - self._first < self.window:
+            return None
+        return self._set(True)
+
+
+def default_rules(etco2, rr, spo2, hr):
+    """The standard rule set, given each vital's channel id."""
+    return [
+        # Flat capnogram with the patient still breathing: the tube is blocked
+        WindowRule("absent-capnogram", etco2, "full", 5, 10, 10, "max"),
+        WindowRule("apnea", rr, "full", 1, 2, 15, "range"),
+        SustainedRule("desaturation", spo2, "partial", 90, 92, 10, above=False),
+        SustainedRule("tachycardia", hr, "partial", 120, 115, 5, above=True),
+        SustainedRule("bradycardia", hr, "partial", 50, 55, 5, above=False),
+    ]
+
+
+class AlarmDetector:
+    """
+    Runs alarm rules over live sample chunks as they are consumed.
+
+    `feed(channel, times, values)` evaluates every rule on that channel and
+    calls `on_change(rule, active)` for each rule that starts or stops
+    firing. Evaluation happens when a chunk is fed, so on top of a rule's
+    own delay a sample reaches its verdict within one acquisition batch and
+    one frame; `worst_latency` holds the largest age (by `clock`) of any
+    sample when it was evaluated, so that bound can be checked in the
+    field. `tick(now)`, called once a frame, runs the rules that depend on
+    time alone, so a stream that stops altogether still raises its alarms.
+    """
+
+    def __init__(self, rules, on_change=None, clock=time.monotonic):
+        self.on_change = on_change or (lambda rule, active: None)
+        self.clock = clock
+        self.worst_latency = 0.0
+        self._rules = {}
+        for rule in rules:
+            self._rules.setdefault(rule.channel, []).append(rule)
+
+    def feed(self, channel, times, values):
+        rules = self._rules.get(channel)
+        if not rules or not len(values):
+            return
+        for rule in rules:
+            changed = rule.update(times, values)
+            if changed is not None:
+                self.on_change(rule, changed)
+        self.worst_latency = max(self.worst_latency, self.clock() - times[0])
+
+    def tick(self, now):
+        for rules in self._rules.values():
+            for rule in rules:
+                changed = rule.tick(now)
+                if changed is not None:
+                    self.on_change(rule, changed)
@@ -0,0 +1,66 @@
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+
+GLYPHS = "0123456789-"
+
+_glyph_cache = {}
+
+
+def digit_glyphs(font_name, font_size):
+    """Textures for 0-9 and '-', rendered once per font and size."""
+    key = (font_name, font_size)
+    glyphs = _glyph_cache.get(key)
+    if glyphs is None:
+        glyphs = {}
+        for ch in GLYPHS:
+            # Rendered white and tinted by the readout's Color instruction
+            label = CoreLabel(text=ch, font_name=font_name, font_size=font_size)
+            label.refresh()
+            glyphs[ch] = label.texture
+        _glyph_cache[key] = glyphs
+    return glyphs
+
+
+class DigitSlots:
+    """
+    A fixed set of rectangles that show an integer from cached glyphs.
+
+    Lets a widget draw any number of readouts on its own canvas: `show()`
+    re-lays out the slots only when the text, font or box changed. None
+    shows "--", and a number too long for the slots fills them with "-".
+    """
+
+    def __init__(self, canvas, color=(1, 1, 1, 1), max_digits=3):
+        with canvas:
+            self.color = Color(*color)
+            self._slots = [Rectangle(size=(0, 0)) for _ in range(max_digits)]
+        self._shown = None
+
+    def show(self, value, font_name, font_size, halign, pos, size):
+        text = "--" if value is None else str(int(value))
+        if len(text) > len(self._slots):
+            # Dropping digits would show a wrong number, e.g. 234 for 1234
+            text = "-" * len(self._slots)
+        key = (text, font_name, font_size, halign, *pos, *size)
+        if key == self._shown:
+            return
+        self._shown = key
+
+        glyphs = digit_glyphs(font_name, font_size)
+        textures = [glyphs[ch] for ch in text]
+        total = sum(tex.width for tex in textures)
+        if halign == "right":
+            x = pos[0] + size[0] - total
+        elif halign == "center":
+            x = pos[0] + (size[0] - total) / 2
+        else:
+            x = pos[0]
+        x = int(x)
+        center_y = pos[1] + size[1] / 2
+        for slot, tex in zip(self._slots, textures):
+            slot.texture = tex
+            slot.size = tex.size
+            slot.pos = (x, int(center_y - tex.height / 2))
+            x += tex.width
+        for slot in self._slots[len(textures) :]:
+            slot.size = (0, 0)
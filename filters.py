@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+
+# Samples worked out per pair of matrix products
+BLOCK = 64
+
+
+class LinearFilter:
+    """
+    Stateful filter y[n] = sum(b[k] * x[n-k]) - sum(a[k] * y[n-k]).
+
+    Chunks of any length are filtered BLOCK samples at a time with two
+    matrix products: the block's impulse response (a lower-triangular
+    Toeplitz matrix) times its inputs, plus the block's response to the
+    filter state, i.e. the last inputs and outputs. Both matrices are
+    worked out once, so there is no Python loop per sample, and the
+    result is exactly the recurrence's. The state starts as if the first
+    sample had always been there, so there is no startup transient. An
+    order-0 filter (one b, one a) has no state and is applied as a gain.
+    """
+
+    def __init__(self, b, a=(1.0,)):
+        a = np.asarray(a, np.float64)
+        self.b = np.asarray(b, np.float64) / a[0]
+        self.a = a / a[0]
+        self._nb = len(self.b) - 1
+        self._na = len(self.a) - 1
+        size = self._nb + self._na
+
+        impulse = np.zeros(BLOCK)
+        impulse[0] = 1
+        h = self._run(impulse, np.zeros(size))
+        rows, cols = np.indices((BLOCK, BLOCK))
+        self._response = np.where(rows >= cols, h[rows - cols], 0.0)
+        self._state_response = np.zeros((BLOCK, size))
+        for i, unit in enumerate(np.eye(size)):
+            self._state_response[:, i] = self._run(np.zeros(BLOCK), unit)
+        self._state = None
+
+    def _run(self, x, state):
+        # The plain recurrence; only used to build the block matrices.
+        # state is [x[n-1], ..., x[n-nb], y[n-1], ..., y[n-na]]
+        inputs = list(state[: self._nb])
+        outputs = list(state[self._nb :])
+        y = np.empty(len(x))
+        for n, value in enumerate(x):
+            inputs.insert(0, value)
+            out = sum(c * v for c, v in zip(self.b, inputs))
+            out -= sum(c * v for c, v in zip(self.a[1:], outputs))
+            y[n] = out
+            inputs.pop()
+            outputs.insert(0, out)
+            if len(outputs) > self._na:
+                outputs.pop()
+        return y
+
+    def process(self, values):
+        values = np.asarray(values, np.float64)
+        if not len(values):
+            return values
+        if not self._nb + self._na:
+            return values * self.b[0]
+        if self._state is None:
+            x0 = values[0]
+            dc = self.b.sum() / self.a.sum() if self.a.sum() else 0.0
+            self._state = np.concatenate(
+                (np.full(self._nb, x0), np.full(self._na, dc * x0))
+            )
+        out = np.empty(len(values))
+        state = self._state
+        for start in range(0, len(values), BLOCK):
+            x = values[start : start + BLOCK]
+            m = len(x)
+            y = self._response[:m, :m] @ x + self._state_response[:m] @ state
+            out[start : start + m] = y
+            inputs = np.concatenate((x[::-1], state[: self._nb]))[: self._nb]
+            outputs = np.concatenate((y[::-1], state[self._nb :]))[: self._na]
+            state = np.concatenate((inputs, outputs))
+        self._state = state
+        return out
+
+
+class FIRLowPass(LinearFilter):
+    """
+    Windowed-sinc low-pass with `taps` coefficients and unity gain at DC.
+    Output lags the input by `delay` samples.
+    """
+
+    def __init__(self, rate, cutoff, taps=31):
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = np.sinc(2 * cutoff / rate * n) * np.hamming(taps)
+        super().__init__(kernel / kernel.sum())
+        self.delay = (taps - 1) / 2
+
+
+class LowPass(LinearFilter):
+    """Second-order Butterworth low-pass (RBJ cookbook) at `cutoff` Hz."""
+
+    def __init__(self, rate, cutoff, q=1 / math.sqrt(2)):
+        w0 = 2 * math.pi * cutoff / rate
+        alpha = math.sin(w0) / (2 * q)
+        cos = math.cos(w0)
+        super().__init__(
+            [(1 - cos) / 2, 1 - cos, (1 - cos) / 2], [1 + alpha, -2 * cos, 1 - alpha]
+        )
+
+
+class Notch(LinearFilter):
+    """Notch at `freq` Hz (e.g. 50 or 60 Hz mains), `freq / q` Hz wide."""
+
+    def __init__(self, rate, freq, q=30):
+        if freq >= rate / 2:
+            raise ValueError(f"{freq} Hz is above the Nyquist rate of {rate} Hz")
+        w0 = 2 * math.pi * freq / rate
+        alpha = math.sin(w0) / (2 * q)
+        cos = math.cos(w0)
+        super().__init__([1, -2 * cos, 1], [1 + alpha, -2 * cos, 1 - alpha])
+
+
+class BaselineFilter(LinearFilter):
+    """
+    Removes baseline wander below `cutoff` Hz with a first-order DC
+    blocker, y[n] = x[n] - x[n-1] + p * y[n-1]. Output is centred on 0.
+    """
+
+    def __init__(self, rate, cutoff=0.5):
+        super().__init__([1, -1], [1, -math.exp(-2 * math.pi * cutoff / rate)])
+
+
+class FilterChain:
+    """Runs a chunk through each stage in turn; stages keep their own state."""
+
+    def __init__(self, *stages):
+        self.stages = stages
+
+    def process(self, values):
+        for stage in self.stages:
+            values = stage.process(values)
+        return values
@@ -0,0 +1,110 @@
+import importlib.util
+import time
+
+# Present on every Pi; RPi.GPIO installs fine elsewhere but cannot drive pins
+MODEL_PATH = "/proc/device-tree/model"
+
+
+class Actuator:
+    """An output device. `close()` releases it; it reopens on next use."""
+
+    def close(self):
+        pass
+
+
+class Buzzer(Actuator):
+    def start(self, freq, duty=50):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+
+class GPIOBuzzer(Buzzer):
+    """
+    PWM buzzer on a Raspberry Pi pin, driven through RPi.GPIO.
+
+    Nothing is imported or configured until the first beep, so building
+    the UI never waits on GPIO setup.
+    """
+
+    def __init__(self, pin):
+        self.pin = pin
+        self._gpio = None
+        self._pwm = None
+
+    def _ensure_pwm(self):
+        if self._pwm is None:
+            import RPi.GPIO as GPIO
+
+            GPIO.setmode(GPIO.BCM)
+            GPIO.setwarnings(False)
+            GPIO.setup(self.pin, GPIO.OUT)
+            self._gpio = GPIO
+            self._pwm = GPIO.PWM(self.pin, 1000)
+        return self._pwm
+
+    def start(self, freq, duty=50):
+        pwm = self._ensure_pwm()
+        pwm.ChangeFrequency(freq)
+        pwm.start(duty)
+
+    def stop(self):
+        # A buzzer that never started has nothing to stop
+        if self._pwm is not None:
+            self._pwm.stop()
+
+    def close(self):
+        if self._pwm is not None:
+            self._pwm.stop()
+            self._gpio.cleanup(self.pin)
+            self._pwm = None
+            self._gpio = None
+
+
+class SimulatedBuzzer(Buzzer):
+    """
+    Buzzer stand-in that records what it was asked to do.
+
+    `events` holds (timestamp, action, freq, duty) tuples, with action
+    "start" or "stop", stamped with `clock` (time.monotonic by default).
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.events = []
+        self.sounding = False
+
+    def start(self, freq, duty=50):
+        self.sounding = True
+        self.events.append((self.clock(), "start", freq, duty))
+
+    def stop(self):
+        self.sounding = False
+        self.events.append((self.clock(), "stop", None, None))
+
+
+def is_raspberry_pi():
+    try:
+        with open(MODEL_PATH, "rb") as f:
+            return b"Raspberry Pi" in f.read()
+    except OSError:
+        return False
+
+
+def create_buzzer(pin, backend=None):
+    """
+    Return a Buzzer for `pin`.
+
+    `backend` is "gpio", "sim", or None to use RPi.GPIO on Raspberry Pi
+    hardware with it installed and the simulated buzzer otherwise.
+    Detection does not import RPi.GPIO.
+    """
+    if backend is None:
+        gpio = is_raspberry_pi() and importlib.util.find_spec("RPi") is not None
+        backend = "gpio" if gpio else "sim"
+    if backend == "gpio":
+        return GPIOBuzzer(pin)
+    if backend == "sim":
+        return SimulatedBuzzer()
+    raise ValueError(f"unknown buzzer backend {backend!r}")
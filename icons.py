@@ -0,0 +1,43 @@
+import os
+
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+
+# Optional; built as described in the README
+ATLAS = "assets/icons.atlas"
+ICONS = (
+    "assets/rr.png",
+    "assets/co2.png",
+    "assets/o2.png",
+    "assets/hr.png",
+    "assets/full.png",
+    "assets/partial.png",
+    "assets/no.png",
+)
+
+_textures = {}
+
+
+def preload_icons():
+    """
+    Decode every icon once, from the atlas when it has been built.
+
+    Afterwards `icon_texture` is a dict lookup, so switching the caution
+    image during an alarm never touches the SD card.
+    """
+    atlas = Atlas(ATLAS) if os.path.exists(ATLAS) else None
+    for path in ICONS:
+        if path in _textures:
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        if atlas is not None and name in atlas.textures:
+            _textures[path] = atlas[name]
+        else:
+            _textures[path] = CoreImage(path).texture
+
+
+def icon_texture(path):
+    """Texture for an icon in ICONS, decoding all of them on first use."""
+    if path not in _textures:
+        preload_icons()
+    return _textures[path]
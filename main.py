@@ -1,6 +1,5 @@
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.relativelayout import RelativeLayout
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
@@ -8,768 +7,213 @@ from kivy.uix.image import Image
 from kivy.graphics import Color, Rectangle, Line, RoundedRectangle
 from kivy.clock import Clock
 from kivy.uix.button import ButtonBehavior
-from kivy.metrics import dp, sp
+from kivy.metrics import dp
+from kivy.properties import ListProperty, NumericProperty
 
+import functools
 import math
 import os
-import random
-
-import RPi.GPIO as GPIO
+import time
+
+from acquisition import Acquisition, SampleQueue, SimulatedSource
+from alarms import (
+    FULL_BLOCKAGE,
+    HIGH,
+    MEDIUM,
+    PARTIAL_BLOCKAGE,
+    AlarmManager,
+    AlarmSequencer,
+)
+from breaths import BreathDetector
+from detection import AlarmDetector, default_rules
+from filters import BaselineFilter, FilterChain, LowPass, Notch
+from hal import create_buzzer
+from icons import icon_texture, preload_icons
+from protocol import FrameReceiver, SimulatedSensorLink, open_serial
+from pulses import PulseDetector
+from recorder import TrendRecorder
+from replay import SessionReplay
+from scheduler import FrameScheduler
+from shm_pipeline import SharedMemoryPipeline
+from streams import RandomSamples
+from trends import TrendPyramid
+from vitals import VitalCard
 
 # Configuration
 BUZZER_PIN = 18
+BUZZER_BACKEND = os.environ.get("BUZZER_BACKEND")  # "gpio", "sim" or auto-detect
+FRAME_BUDGET = 1 / 30  # seconds of work per frame before it counts as overrun
+ACQUISITION_PROCESS = False  # read sensors in a worker process via shared memory
+TREND_DIR = os.environ.get("TREND_DIR", "trends")  # "" disables recording
+# Play a recorded session (a trend directory) instead of the sensors
+REPLAY_DIR = os.environ.get("REPLAY_DIR")
+REPLAY_SPEED = float(os.environ.get("REPLAY_SPEED", "1"))  # 10-100 for soak tests
+# Serial port (or pty) the sensor board sends binary frames on; "sim" runs a
+# simulated board on a pty. Unset reads the simulated streams directly.
+SENSOR_PORT = os.environ.get("SENSOR_PORT")
+SENSOR_BAUD = int(os.environ.get("SENSOR_BAUD", "115200"))
+MAINS_HZ = 50  # notched out of sensor channels sampled fast enough to see it
+AUTO_ALARMS = True  # raise alarms from the vitals, not only the status buttons
+
+# GPIO is only set up on the first beep
+buzzer = create_buzzer(BUZZER_PIN, BUZZER_BACKEND)
+
+
+def respiratory_waveform():
+    waveform = []
+    cycles = 5  # total breathing cycles (each cycle = inhale + exhale)
+
+    for cycle in range(cycles):
+        for i in range(40):  # 40 samples per cycle (2 seconds at 20 FPS)
+            t = i / 40.0
+            # Smooth sinusoidal wave for breathing
+            val = 16 + math.sin(t * 2 * math.pi) * 4  # peak-to-peak: 16
+            waveform.append(val)
+
+    return waveform
+
+
+def etco2_waveform(
+    cycles=10,
+    plateau_duration=30,
+    baseline_duration=10,
+    upstroke_duration=10,
+    downstroke_duration=8,
+):
+    """
+    Generate a normal ETCO2 capnograph waveform for a number of respiratory cycles with proportional durations for each phase.
 
-# Initialize GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setwarnings(False)
-GPIO.setup(BUZZER_PIN, GPIO.OUT)
-buzzer_pwm = GPIO.PWM(BUZZER_PIN, 1000)
-
-
-def start_buzzer(freq, duty=50):
-    buzzer_pwm.ChangeFrequency(freq)
-    buzzer_pwm.start(duty)
-
-
-def stop_buzzer():
-    buzzer_pwm.stop()
-
-
-def cleanup():
-    GPIO.cleanup()
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setwarnings(False)
-    GPIO.setup(BUZZER_PIN, GPIO.OUT)
-    stop_buzzer()
-
-
-class RespiratoryComponent(FloatLayout):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.size_hint_y = None
-        self.height = dp(190)
-
-        # Background rectangle
-        with self.canvas.before:
-            Color(148 / 255, 155 / 255, 164 / 255, 0.20)
-            self.bg_rect = RoundedRectangle(
-                size=self.size, pos=self.pos, radius=[(28, 28)] * 4
-            )
-        self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
-
-        # Main horizontal content container
-        content_layout = BoxLayout(
-            orientation="horizontal",
-            spacing=dp(16),
-            padding=[dp(24), dp(16), dp(24), dp(620)],
-        )
-        self.add_widget(content_layout)
-
-        # Left section: text content
-        left_layout = BoxLayout(
-            orientation="vertical", spacing=dp(4), size_hint_x=None, width=dp(220)
-        )
-        roboto_bold_path = os.path.join("assets", "Roboto-Bold.ttf")
-        title_label = Label(
-            text="[b]Respiratory Rate(RR):[/b]",
-            markup=True,
-            size_hint=(1, None),
-            padding=[dp(80), dp(0), dp(0), dp(0)],
-            size=(dp(275), dp(200)),
-            color=(126 / 255, 255 / 255, 236 / 255, 1),
-            font_name=roboto_bold_path
-            if os.path.exists(roboto_bold_path)
-            else "Roboto",
-            font_size=14,
-            halign="left",
-            valign="middle",
-        )
-        title_label.bind(size=title_label.setter("text_size"))
-
-        value_row = BoxLayout(
-            orientation="horizontal", spacing=dp(8), size_hint=(1, None), height=dp(38)
-        )
-        self.value_label = Label(
-            text="98",
-            font_size=sp(72),
-            color=(1, 1, 1, 1),
-            size_hint=(None, None),
-            size=(dp(275), dp(130)),
-            halign="right",
-            valign="middle",
-        )
-        self.value_label.bind(size=self.value_label.setter("text_size"))
-
-        value_row.add_widget(self.value_label)
-
-        left_layout.add_widget(title_label)
-        left_layout.add_widget(value_row)
-
-        # Graph widget
-        self.graph_widget = Widget(size_hint_y=0.80)
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            self.graph_line = Line(width=dp(1.5))
-        self.graph_widget.bind(size=self.update_graph, pos=self.update_graph)
-
-        # Min/Max vertical layout aligned with graph
-        min_max_layout = BoxLayout(
-            orientation="vertical",
-            size_hint=(None, 1),
-            width=dp(120),
-            padding=(dp(20), 0, dp(50), dp(30)),
-        )
-        self.max_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(90),
-            halign="left",
-            valign="middle",
-        )
-        self.max_label.bind(size=self.max_label.setter("text_size"))
-
-        self.min_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(20),
-            halign="left",
-            valign="middle",
-        )
-        self.min_label.bind(size=self.min_label.setter("text_size"))
-
-        min_max_layout.add_widget(self.max_label)
-        min_max_layout.add_widget(self.min_label)
-        graph_layout = BoxLayout(
-            orientation="horizontal", spacing=dp(8), padding=[0, 0, dp(80), 0]
-        )
-
-        # Set the graph widget to take less horizontal space
-        self.graph_widget.size_hint = (0.5, 1)
-
-        # Reorder: min/max comes first (on the left), then the graph
-        graph_layout.add_widget(min_max_layout)
-        graph_layout.add_widget(self.graph_widget)
-
-        # Add to content layout
-        content_layout.add_widget(left_layout)
-        content_layout.add_widget(graph_layout)
-
-        # Top-left Icon
-        self.icon = Image(
-            source="assets/rr.png",
-            size_hint=(None, None),
-            size=(dp(89), dp(87)),
-            pos_hint={"x": 0.01, "top": 0.95},
-        )
-        self.add_widget(self.icon)
-
-        # Data buffer
-        self.data_buffer = self.generate_waveform()
-        Clock.schedule_interval(self.update_data, 0.05)  # 20 FPS
-
-    def _update_bg_rect(self, *args):
-        self.bg_rect.size = self.size
-        self.bg_rect.pos = self.pos
-
-    def generate_waveform(self):
-        waveform = []
-        cycles = 5  # total breathing cycles (each cycle = inhale + exhale)
-
-        for cycle in range(cycles):
-            for i in range(40):  # 40 samples per cycle (2 seconds at 20 FPS)
-                t = i / 40.0
-                # Smooth sinusoidal wave for breathing
-                val = 16 + math.sin(t * 2 * math.pi) * 4  # peak-to-peak: 16
-                waveform.append(val)
-
-        return waveform
-
-    def update_data(self, dt):
-        # Scroll data
-        self.data_buffer = self.data_buffer[1:] + [self.data_buffer[0]]
-        new_val = int(self.data_buffer[-1])
-        self.value_label.text = str(new_val)
-        self.max_label.text = str(int(max(self.data_buffer)))
-        self.min_label.text = str(int(min(self.data_buffer)))
-        self.update_graph()
-
-    def update_graph(self, *args):
-        self.graph_widget.canvas.clear()
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            width = self.graph_widget.width
-            height = self.graph_widget.height + dp(120)
-            x0 = self.graph_widget.x
-            y0 = self.graph_widget.y + dp(420)
-            baseline = y0 + height * 0.4  # centered vertically
-            amplitude = height * 0.4  # breathing wave needs large amplitude
-
-            n = len(self.data_buffer)
-            points = []
-            for i, val in enumerate(self.data_buffer):
-                x = x0 + i * (width / n)
-                y = baseline + ((val - 100) / 10) * amplitude
-                points.extend([x, y])
-
-            Line(points=points, width=dp(2))
-
-
-class CO2Component(FloatLayout):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.size_hint_y = None
-        self.height = dp(190)
-
-        # Background rectangle
-        with self.canvas.before:
-            Color(148 / 255, 155 / 255, 164 / 255, 0.20)
-            self.bg_rect = RoundedRectangle(
-                size=self.size, pos=self.pos, radius=[(28, 28)] * 4
-            )
-        self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
-
-        # Main horizontal content container
-        content_layout = BoxLayout(
-            orientation="horizontal",
-            spacing=dp(16),
-            padding=[dp(24), dp(16), dp(24), dp(422)],
-        )
-        self.add_widget(content_layout)
-
-        # Left section: text content
-        left_layout = BoxLayout(
-            orientation="vertical", spacing=dp(4), size_hint_x=None, width=dp(200)
-        )
-        roboto_bold_path = os.path.join("assets", "Roboto-Bold.ttf")
-        title_label = Label(
-            text="[b]ETC02:[/b]",
-            markup=True,
-            size_hint=(1, None),
-            padding=[dp(80), dp(0), dp(0), dp(0)],
-            size=(dp(275), dp(200)),
-            color=(126 / 255, 255 / 255, 236 / 255, 1),
-            font_name=roboto_bold_path
-            if os.path.exists(roboto_bold_path)
-            else "Roboto",
-            font_size=14,
-            halign="left",
-            valign="middle",
-        )
-        title_label.bind(size=title_label.setter("text_size"))
-
-        value_row = BoxLayout(
-            orientation="horizontal", spacing=dp(8), size_hint=(1, None), height=dp(38)
-        )
-        self.value_label = Label(
-            text="98",
-            font_size=sp(72),
-            color=(1, 1, 1, 1),
-            size_hint=(None, None),
-            size=(dp(275), dp(130)),
-            halign="right",
-            valign="middle",
-        )
-        self.value_label.bind(size=self.value_label.setter("text_size"))
-
-        value_row.add_widget(self.value_label)
-
-        left_layout.add_widget(title_label)
-        left_layout.add_widget(value_row)
-
-        # Graph widget
-        self.graph_widget = Widget(size_hint_y=0.80)
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            self.graph_line = Line(width=dp(1.5))
-        self.graph_widget.bind(size=self.update_graph, pos=self.update_graph)
-
-        # Min/Max vertical layout aligned with graph
-        min_max_layout = BoxLayout(
-            orientation="vertical",
-            size_hint=(None, 1),
-            width=dp(150),
-            padding=(0, 0, dp(50), dp(30)),
-        )
-        self.max_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(90),
-            halign="left",
-            valign="middle",
-        )
-        self.max_label.bind(size=self.max_label.setter("text_size"))
-
-        self.min_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(20),
-            halign="left",
-            valign="middle",
-        )
-        self.min_label.bind(size=self.min_label.setter("text_size"))
-
-        min_max_layout.add_widget(self.max_label)
-        min_max_layout.add_widget(self.min_label)
-        graph_layout = BoxLayout(
-            orientation="horizontal", spacing=dp(8), padding=[0, 0, dp(80), 0]
-        )
-
-        # Set the graph widget to take less horizontal space
-        self.graph_widget.size_hint = (0.5, 1)
-
-        # Reorder: min/max comes first (on the left), then the graph
-        graph_layout.add_widget(min_max_layout)
-        graph_layout.add_widget(self.graph_widget)
-
-        # Add to content layout
-        content_layout.add_widget(left_layout)
-        content_layout.add_widget(graph_layout)
-
-        # Top-left Icon
-        self.icon = Image(
-            source="assets/co2.png",
-            size_hint=(None, None),
-            size=(dp(89), dp(87)),
-            pos_hint={"x": 0.01, "top": 0.95},
-        )
-        self.add_widget(self.icon)
-
-        # Data buffer
-        self.data_buffer = self.generate_waveform()
-        Clock.schedule_interval(self.update_data, 0.05)  # 20 FPS
-
-    def _update_bg_rect(self, *args):
-        self.bg_rect.size = self.size
-        self.bg_rect.pos = self.pos
-
-    def generate_waveform(
-        self,
-        cycles=10,
-        plateau_duration=30,
-        baseline_duration=10,
-        upstroke_duration=10,
-        downstroke_duration=8,
-    ):
-        """
-        Generate a normal ETCO2 capnograph waveform for a number of respiratory cycles with proportional durations for each phase.
-
-        Parameters:
-        - cycles: Number of respiratory cycles to simulate.
-        - plateau_duration: Duration of the alveolar plateau (Phase III) in terms of number of samples.
-        - baseline_duration: Duration of the baseline phase (Phase I) in terms of number of samples.
-        - upstroke_duration: Duration of the expiratory upstroke phase (Phase II) in terms of number of samples.
-        - downstroke_duration: Duration of the inspiratory downstroke phase (Phase IV) in terms of number of samples.
-
-        Returns:
-        - A list representing the ETCO2 waveform (in mmHg).
-        """
-        waveform = []
-
-        for cycle in range(cycles):  # Each cycle represents one breath
-            # Phase I – Baseline (0-5 mmHg)
-            for _ in range(baseline_duration):  # Baseline duration adjustable
-                waveform.append(2)  # Low CO2 level during baseline (0–5 mmHg)
-
-            # Phase II – Expiratory upstroke (5 → 35 mmHg)
-            for i in range(
-                upstroke_duration
-            ):  # Exhalation increase from 5 mmHg to 35 mmHg
-                val = 5 + (
-                    i * (30 / upstroke_duration)
-                )  # Gradual increase in CO2 concentration
-                waveform.append(val)
-
-            # Phase III – Alveolar plateau (35–45 mmHg) – Now with adjustable duration
-            plateau_value = (
-                40  # Alveolar plateau typically around 40 mmHg, can vary between 35-45
-            )
-            for _ in range(plateau_duration):  # Extended plateau phase
-                waveform.append(plateau_value)  # Constant value for alveolar CO2
-
-            # Phase IV – Inspiratory downstroke (45 → 0 mmHg)
-            for i in range(
-                downstroke_duration
-            ):  # Rapid decrease in CO2 as inspiration begins
-                val = 45 - (i * (45 / downstroke_duration))  # Drop from 45 to baseline
-                waveform.append(val)
-
-            for _ in range(baseline_duration):  # Return to baseline
-                waveform.append(2)  # Small return to the baseline CO2 level
-
-        return waveform
-
-    def update_data(self, dt):
-        # Scroll data
-        self.data_buffer = self.data_buffer[1:] + [self.data_buffer[0]]
-        new_val = int(self.data_buffer[-1])
-        self.value_label.text = str(new_val)
-        self.max_label.text = str(int(max(self.data_buffer)))
-        self.min_label.text = str(int(min(self.data_buffer)))
-        self.update_graph()
-
-    def update_graph(self, *args):
-        self.graph_widget.canvas.clear()
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            width = self.graph_widget.width
-            height = self.graph_widget.height + dp(90)
-            x0 = self.graph_widget.x
-            y0 = self.graph_widget.y + dp(190)
-            baseline = y0 + height * 0.75  # higher baseline
-            amplitude = height * 0.25
-
-            n = len(self.data_buffer)
-            points = []
-            for i, val in enumerate(self.data_buffer):
-                x = x0 + i * (width / n)
-                y = baseline + ((val - 100) / 10) * amplitude
-                points.extend([x, y])
-
-            Line(points=points, width=dp(2))
-
-
-class SpO2Component(FloatLayout):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.size_hint_y = None
-        self.height = dp(190)
-
-        # Background rectangle
-        with self.canvas.before:
-            Color(148 / 255, 155 / 255, 164 / 255, 0.20)
-            self.bg_rect = RoundedRectangle(
-                size=self.size, pos=self.pos, radius=[(28, 28)] * 4
-            )
-        self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
-
-        # Main horizontal content container
-        content_layout = BoxLayout(
-            orientation="horizontal",
-            spacing=dp(16),
-            padding=[dp(24), dp(16), dp(24), dp(224)],
-        )
-        self.add_widget(content_layout)
-
-        # Left section: text content
-        left_layout = BoxLayout(
-            orientation="vertical", spacing=dp(4), size_hint_x=None, width=dp(200)
-        )
-        roboto_bold_path = os.path.join("assets", "Roboto-Bold.ttf")
-        title_label = Label(
-            text="[b]SPO2:[/b]",
-            markup=True,
-            size_hint=(1, None),
-            padding=[dp(80), dp(0), dp(0), dp(0)],
-            size=(dp(275), dp(200)),
-            color=(126 / 255, 255 / 255, 236 / 255, 1),
-            font_name=roboto_bold_path
-            if os.path.exists(roboto_bold_path)
-            else "Roboto",
-            font_size=14,
-            halign="left",
-            valign="middle",
-        )
-        title_label.bind(size=title_label.setter("text_size"))
-
-        value_row = BoxLayout(
-            orientation="horizontal", spacing=dp(8), size_hint=(1, None), height=dp(38)
-        )
-        self.value_label = Label(
-            text="98",
-            font_size=sp(72),
-            color=(1, 1, 1, 1),
-            size_hint=(None, None),
-            size=(dp(275), dp(130)),
-            halign="right",
-            valign="middle",
-        )
-        self.value_label.bind(size=self.value_label.setter("text_size"))
-
-        value_row.add_widget(self.value_label)
-
-        left_layout.add_widget(title_label)
-        left_layout.add_widget(value_row)
-
-        # Graph widget
-        self.graph_widget = Widget(size_hint_y=0.80)
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            self.graph_line = Line(width=dp(1.5))
-        self.graph_widget.bind(size=self.update_graph, pos=self.update_graph)
-
-        # Min/Max vertical layout aligned with graph
-        min_max_layout = BoxLayout(
-            orientation="vertical",
-            size_hint=(None, 1),
-            width=dp(150),
-            padding=(0, 0, dp(50), dp(30)),
-        )
-        self.max_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(90),
-            halign="left",
-            valign="middle",
-        )
-        self.max_label.bind(size=self.max_label.setter("text_size"))
-
-        self.min_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(20),
-            halign="left",
-            valign="middle",
-        )
-        self.min_label.bind(size=self.min_label.setter("text_size"))
-
-        min_max_layout.add_widget(self.max_label)
-        min_max_layout.add_widget(self.min_label)
-        graph_layout = BoxLayout(
-            orientation="horizontal", spacing=dp(8), padding=[0, 0, dp(80), 0]
-        )
+    Parameters:
+    - cycles: Number of respiratory cycles to simulate.
+    - plateau_duration: Duration of the alveolar plateau (Phase III) in terms of number of samples.
+    - baseline_duration: Duration of the baseline phase (Phase I) in terms of number of samples.
+    - upstroke_duration: Duration of the expiratory upstroke phase (Phase II) in terms of number of samples.
+    - downstroke_duration: Duration of the inspiratory downstroke phase (Phase IV) in terms of number of samples.
 
-        # Set the graph widget to take less horizontal space
-        self.graph_widget.size_hint = (0.5, 1)
+    Returns:
+    - A list representing the ETCO2 waveform (in mmHg).
+    """
+    waveform = []
 
-        # Reorder: min/max comes first (on the left), then the graph
-        graph_layout.add_widget(min_max_layout)
-        graph_layout.add_widget(self.graph_widget)
+    for cycle in range(cycles):  # Each cycle represents one breath
+        # Phase I – Baseline (0-5 mmHg)
+        for _ in range(baseline_duration):  # Baseline duration adjustable
+            waveform.append(2)  # Low CO2 level during baseline (0–5 mmHg)
 
-        # Add to content layout
-        content_layout.add_widget(left_layout)
-        content_layout.add_widget(graph_layout)
+        # Phase II – Expiratory upstroke (5 → 35 mmHg)
+        for i in range(upstroke_duration):  # Exhalation increase from 5 to 35 mmHg
+            val = 5 + (
+                i * (30 / upstroke_duration)
+            )  # Gradual increase in CO2 concentration
+            waveform.append(val)
 
-        # Top-left Icon
-        self.icon = Image(
-            source="assets/o2.png",
-            size_hint=(None, None),
-            size=(dp(89), dp(87)),
-            pos_hint={"x": 0.01, "top": 0.95},
+        # Phase III – Alveolar plateau (35–45 mmHg) – Now with adjustable duration
+        plateau_value = (
+            40  # Alveolar plateau typically around 40 mmHg, can vary between 35-45
         )
-        self.add_widget(self.icon)
-
-        # Data buffer
-        self.data_buffer = self.generate_waveform()
-        Clock.schedule_interval(self.update_data, 0.5)  # 20 FPS
-
-    def _update_bg_rect(self, *args):
-        self.bg_rect.size = self.size
-        self.bg_rect.pos = self.pos
-
-    def generate_waveform(self):
-        # Emulate SpO2 waveform: smooth sine-like peaks
-        waveform = []
-        for i in range(200):
-            t = i / 20.0
-            y = math.sin(t * math.pi * 2) * 2  # sine wave
-            y += math.exp(-(((t % 1) * 10 - 5) ** 2) / 6) * 5  # pulse peak
-            waveform.append(94 + y)
-        return waveform
-
-    def update_data(self, dt):
-        # Scroll data
-        self.data_buffer = self.data_buffer[1:] + [self.data_buffer[0]]
-        new_val = int(self.data_buffer[-1])
-        self.value_label.text = str(new_val)
-        self.max_label.text = str(int(max(self.data_buffer)))
-        self.min_label.text = str(int(min(self.data_buffer)))
-        self.update_graph()
-
-    def update_graph(self, *args):
-        self.graph_widget.canvas.clear()
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            width = self.graph_widget.width
-            height = self.graph_widget.height + dp(100)
-            x0 = self.graph_widget.x
-            y0 = self.graph_widget.y + dp(10)
-            baseline = y0 + height * 1
-            amplitude = height * 1.2
-
-            n = len(self.data_buffer)
-            points = []
-            for i, val in enumerate(self.data_buffer):
-                x = x0 + i * (width / n)
-                y = baseline + ((val - 100) / 10) * amplitude
-                points.extend([x, y])
-
-            Line(points=points, width=dp(2))
-
-
-class HeartRateComponent(FloatLayout):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.size_hint_y = None
-        self.height = dp(190)
+        for _ in range(plateau_duration):  # Extended plateau phase
+            waveform.append(plateau_value)  # Constant value for alveolar CO2
 
-        # Background rectangle
-        with self.canvas.before:
-            Color(148 / 255, 155 / 255, 164 / 255, 0.20)
-            self.bg_rect = RoundedRectangle(
-                size=self.size, pos=self.pos, radius=[(28, 28)] * 4
-            )
-        self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
+        # Phase IV – Inspiratory downstroke (45 → 0 mmHg)
+        for i in range(
+            downstroke_duration
+        ):  # Rapid decrease in CO2 as inspiration begins
+            val = 45 - (i * (45 / downstroke_duration))  # Drop from 45 to baseline
+            waveform.append(val)
 
-        # Main horizontal content container
-        content_layout = BoxLayout(
-            orientation="horizontal",
-            spacing=dp(16),
-            padding=[dp(24), dp(16), dp(24), dp(26)],
-        )
-        self.add_widget(content_layout)
+        for _ in range(baseline_duration):  # Return to baseline
+            waveform.append(2)  # Small return to the baseline CO2 level
 
-        # Left section: text content
-        left_layout = BoxLayout(
-            orientation="vertical", spacing=dp(4), size_hint_x=None, width=dp(200)
-        )
-        roboto_bold_path = os.path.join("assets", "Roboto-Bold.ttf")
-        title_label = Label(
-            text="[b]Heart rate (HR) :[/b]",
-            markup=True,
-            size_hint=(1, None),
-            padding=[dp(80), dp(0), dp(0), dp(0)],
-            size=(dp(275), dp(200)),
-            color=(126 / 255, 255 / 255, 236 / 255, 1),
-            font_name=roboto_bold_path
-            if os.path.exists(roboto_bold_path)
-            else "Roboto",
-            font_size=14,
-            halign="left",
-            valign="middle",
-        )
-        title_label.bind(size=title_label.setter("text_size"))
+    return waveform
 
-        value_row = BoxLayout(
-            orientation="horizontal", spacing=dp(8), size_hint=(1, None), height=dp(38)
-        )
-        self.value_label = Label(
-            text="98",
-            font_size=sp(72),
-            color=(1, 1, 1, 1),
-            size_hint=(None, None),
-            size=(dp(275), dp(130)),
-            halign="right",
-            valign="middle",
-        )
-        self.value_label.bind(size=self.value_label.setter("text_size"))
 
-        value_row.add_widget(self.value_label)
+def spo2_waveform():
+    # Emulate SpO2 waveform: smooth sine-like peaks
+    waveform = []
+    for i in range(200):
+        t = i / 20.0
+        y = math.sin(t * math.pi * 2) * 2  # sine wave
+        y += math.exp(-(((t % 1) * 10 - 5) ** 2) / 6) * 5  # pulse peak
+        waveform.append(94 + y)
+    return waveform
 
-        left_layout.add_widget(title_label)
-        left_layout.add_widget(value_row)
 
-        # Graph widget
-        self.graph_widget = Widget(size_hint_y=0.80)
-        with self.graph_widget.canvas:
-            Color(126 / 255, 255 / 255, 236 / 255, 1)
-            self.graph_line = Line(width=dp(1.5))
-        self.graph_widget.bind(size=self.update_graph, pos=self.update_graph)
+def sensor_filters(rate):
+    """Smoothing for a sensor channel, plus a mains notch if `rate` allows."""
+    stages = [LowPass(rate, cutoff=rate / 4)]
+    if rate > 2 * MAINS_HZ:
+        stages.insert(0, Notch(rate, MAINS_HZ))
+    return FilterChain(*stages)
 
-        # Min/Max vertical layout aligned with graph
-        min_max_layout = BoxLayout(
-            orientation="vertical",
-            size_hint=(None, 1),
-            width=dp(150),
-            padding=(dp(0), 0, dp(50), dp(30)),
-        )
-        self.max_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(90),
-            halign="left",
-            valign="middle",
-        )
-        self.max_label.bind(size=self.max_label.setter("text_size"))
 
-        self.min_label = Label(
-            text="--",
-            font_size=sp(16),
-            color=(0.7, 0.7, 0.7, 1),
-            size_hint=(1, None),
-            height=dp(20),
-            halign="left",
-            valign="middle",
-        )
-        self.min_label.bind(size=self.min_label.setter("text_size"))
-
-        min_max_layout.add_widget(self.max_label)
-        min_max_layout.add_widget(self.min_label)
-        graph_layout = BoxLayout(
-            orientation="horizontal", spacing=dp(8), padding=[0, 0, dp(80), 0]
-        )
-
-        # Set the graph widget to take less horizontal space
-        self.graph_widget.size_hint = (0.5, 1)
-
-        # Reorder: min/max comes first (on the left), then the graph
-        graph_layout.add_widget(min_max_layout)
-        graph_layout.add_widget(self.graph_widget)
-
-        # Add to content layout
-        content_layout.add_widget(left_layout)
-        content_layout.add_widget(graph_layout)
+class SensorFilters:
+    """
+    `design(rate)` (sensor_filters() by default) for a channel whose rate
+    is known only once its source reports it: `rate()` returns samples/s,
+    or None before then. The filter is designed on the first chunk; until
+    the rate is known samples pass through unfiltered.
+    """
 
-        # Top-left Icon
-        self.icon = Image(
-            source="assets/hr.png",
-            size_hint=(None, None),
-            size=(dp(89), dp(87)),
-            pos_hint={"x": 0.01, "top": 0.95},
-        )
-        self.add_widget(self.icon)
-
-        # Data buffer for dynamic waveform
-        self.data_buffer = [random.randint(80, 100) for _ in range(60)]
-        self.max_val = max(self.data_buffer)
-        self.min_val = min(self.data_buffer)
-
-        Clock.schedule_interval(self.update_data, 0.6)
-
-    def _update_bg_rect(self, *args):
-        self.bg_rect.size = self.size
-        self.bg_rect.pos = self.pos
-
-    def update_graph(self, *args):
-        width = self.graph_widget.width
-        height = self.graph_widget.height
-        x0 = self.graph_widget.x
-        y0 = self.graph_widget.y
-        points = []
-        baseline = y0 + height * 0.8
-        amplitude = height * 0.35
-
-        n = len(self.data_buffer)
-        for i, val in enumerate(self.data_buffer):
-            x = x0 + i * (width / n)
-            y = baseline + ((val - 100) / 10) * amplitude
-            points.extend([x, y])
-        self.graph_line.points = points
-
-    def update_data(self, dt):
-        new_value = 85 + random.randint(-5, 8)
-        self.data_buffer.append(new_value)
-        if len(self.data_buffer) > 30:
-            self.data_buffer.pop(0)
-        self.max_val = max(self.data_buffer)
-        self.min_val = min(self.data_buffer)
-        self.value_label.text = str(new_value)
-        self.max_label.text = f"{self.max_val}"
-        self.min_label.text = f"{self.min_val}"
-        self.update_graph()
+    def __init__(self, rate, design=sensor_filters):
+        self.rate = rate
+        self.design = design
+        self._chain = None
+
+    def process(self, values):
+        if self._chain is None:
+            rate = self.rate()
+            if not rate:
+                return values
+            self._chain = self.design(rate)
+        return self._chain.process(values)
+
+
+# One VitalCard per entry; sample_interval is seconds between samples, mode
+# is "scroll" or "sweep" and channel is the id its samples are recorded under
+VITALS = [
+    dict(
+        title="Respiratory Rate(RR):",
+        channel=0,
+        icon="assets/rr.png",
+        source=respiratory_waveform(),
+        sample_interval=0.05,  # 20 samples/s
+        value_range=(10, 22),
+        mode="scroll",
+    ),
+    dict(
+        title="ETC02:",
+        channel=1,
+        icon="assets/co2.png",
+        source=etco2_waveform(),
+        sample_interval=0.05,  # 20 samples/s
+        value_range=(0, 48),
+        mode="scroll",
+    ),
+    dict(
+        title="SPO2:",
+        channel=2,
+        icon="assets/o2.png",
+        source=spo2_waveform(),
+        sample_interval=0.05,  # 20 samples/s, one pulse a second
+        value_range=(90, 101),
+        mode="scroll",
+    ),
+    dict(
+        title="Heart rate (HR) :",
+        channel=3,
+        icon="assets/hr.png",
+        # The app replaces this stream with beats from the pleth; the random
+        # source stands in wherever the card runs on its own. No prefill:
+        # the card shows "--" until the first beat is found
+        source=RandomSamples(85 - 5, 85 + 8),
+        sample_interval=0.6,  # about one beat
+        value_range=(40, 140),
+        capacity=60,
+        initial=(),
+        line_width=1.5,
+        mode="scroll",
+    ),
+]
 
 
 # Make image behave like a button
@@ -778,6 +222,17 @@ class ClickableImage(ButtonBehavior, Image):
 
 
 class ColorBlock(ButtonBehavior, Widget):
+    """
+    A rounded, bordered block. Its canvas instructions are built once;
+    changing `color`, `border_color`, the geometry or the radius updates
+    them in place.
+    """
+
+    color = ListProperty([1, 1, 1, 1])
+    border_color = ListProperty([1, 1, 1, 1])
+    corner_radius = NumericProperty(20)
+    border_width = NumericProperty(1)
+
     def __init__(
         self,
         color=(1, 1, 1, 1),
@@ -791,27 +246,38 @@ class ColorBlock(ButtonBehavior, Widget):
         self.border_color = border_color or color
         self.corner_radius = corner_radius
         self.border_width = border_width
-        self.bind(pos=self.update_canvas, size=self.update_canvas)
+        with self.canvas:
+            self._fill_color = Color(*self.color)
+            self._fill = RoundedRectangle()
+            self._border_color = Color(*self.border_color)
+            self._border = Line()
+        self.bind(
+            pos=self.update_canvas,
+            size=self.update_canvas,
+            corner_radius=self.update_canvas,
+            border_width=self.update_canvas,
+            color=self._update_colors,
+            border_color=self._update_colors,
+        )
         self.update_canvas()
 
+    def _update_colors(self, *args):
+        self._fill_color.rgba = self.color
+        self._border_color.rgba = self.border_color
+
     def update_canvas(self, *args):
-        self.canvas.clear()
-        with self.canvas:
-            Color(*self.color)
-            RoundedRectangle(
-                pos=self.pos, size=self.size, radius=[dp(self.corner_radius)]
-            )
-            Color(*self.border_color)
-            Line(
-                rounded_rectangle=(
-                    self.x,
-                    self.y,
-                    self.width,
-                    self.height,
-                    dp(self.corner_radius),
-                ),
-                width=self.border_width,
-            )
+        radius = dp(self.corner_radius)
+        self._fill.pos = self.pos
+        self._fill.size = self.size
+        self._fill.radius = [radius]
+        self._border.width = self.border_width
+        self._border.rounded_rectangle = (
+            self.x,
+            self.y,
+            self.width,
+            self.height,
+            radius,
+        )
 
 
 class SectionCard(BoxLayout):
@@ -866,16 +332,20 @@ class SidebarPanel(BoxLayout):
                 width=1,
             )
         self.bind(pos=self._upd_panel, size=self._upd_panel)
-        self.buzzer_event = None  # will hold the schedule interval
-        self._buzzer_stop_ev = None  # will hold the one-time stop callback
+
+        # buzzer patterns play on their own thread, off the UI clock; the
+        # caution blink follows the winning alarm's timeline
+        self.sequencer = AlarmSequencer(buzzer)
+        self.sequencer.start()
+        self.alarms = AlarmManager(self.sequencer, on_change=self._on_alarm_change)
 
         # state & callback
         self.status_callback = status_callback or (lambda label, path: None)
         self.status_blocks = []
+        self.statuses = {}  # status -> (block, color, caution image)
         self.active_status = (0.30, 0.73, 0.15, 1)
         self.current_image_path = "assets/no.png"
         self.blink_event = None
-        self.blink_state = True
 
         # build sections
         self._build_caution_card()
@@ -887,9 +357,6 @@ class SidebarPanel(BoxLayout):
             blk = self.status_blocks[2]
             blk.color = self.active_status
             blk.border_color = self.active_status
-            blk.update_canvas()
-
-        self.buzzer_event = None
 
     def _upd_panel(self, *args):
         self._panel_bg.pos = self.pos
@@ -907,7 +374,7 @@ class SidebarPanel(BoxLayout):
         card = SectionCard(size_hint=(1, None), height=dp(200))
         rl = RelativeLayout()
         img = Image(
-            source=self.current_image_path,
+            texture=icon_texture(self.current_image_path),
             size_hint=(None, None),
             size=(dp(156), dp(156)),
             pos_hint={"center_x": 0.5, "center_y": 0.5},
@@ -930,11 +397,16 @@ class SidebarPanel(BoxLayout):
             width=dp(231),
         )
         status_data = [
-            ("Full\nblockage", (0.78, 0.17, 0.17, 1), "assets/full.png"),
-            ("Partial\nblockage", (0.82, 0.73, 0.41, 1), "assets/partial.png"),
-            ("No\nblockage", (0.30, 0.73, 0.15, 1), "assets/no.png"),
+            ("full", "Full\nblockage", (0.78, 0.17, 0.17, 1), "assets/full.png"),
+            (
+                "partial",
+                "Partial\nblockage",
+                (0.82, 0.73, 0.41, 1),
+                "assets/partial.png",
+            ),
+            ("no", "No\nblockage", (0.30, 0.73, 0.15, 1), "assets/no.png"),
         ]
-        for text, col, img_path in status_data:
+        for status, text, col, img_path in status_data:
             row = BoxLayout(
                 orientation="horizontal",
                 spacing=dp(10),
@@ -949,12 +421,12 @@ class SidebarPanel(BoxLayout):
                 corner_radius=20,
             )
             block.bind(
-                on_press=lambda inst,
-                lt=text,
-                bc=col,
-                ip=img_path: self._on_status_press(inst, lt, bc, ip)
+                on_press=lambda inst, st=status, lt=text: self._on_status_press(
+                    st, lt
+                )
             )
             self.status_blocks.append(block)
+            self.statuses[status] = (block, col, img_path)
 
             lbl = Label(
                 text=text,
@@ -979,56 +451,35 @@ class SidebarPanel(BoxLayout):
         wrapper.add_widget(Widget(size_hint_x=None, height=dp(10)))
         self.add_widget(wrapper)
 
-    def _on_status_press(self, inst, label_text, bc, img_path):
+    def _on_status_press(self, status, label_text):
+        self.status_callback(label_text, self.statuses[status][2])
+        # the blockage alarm replaces itself; the manager picks what sounds
+        # and the highlight follows it, so a detected alarm outranks "No"
+        self._set_alarm("blockage", status)
+
+    def on_detection(self, rule, active):
+        # AlarmDetector callback: each rule is its own alarm condition
+        self._set_alarm(rule.name, rule.status if active else "no")
+
+    def _set_alarm(self, name, status):
+        if status == "full":
+            # every 0.6s, a 0.3s 330Hz beep
+            self.alarms.raise_alarm(name, HIGH, FULL_BLOCKAGE, status)
+        elif status == "partial":
+            # every 1.8s, a 0.9s 440Hz beep
+            self.alarms.raise_alarm(name, MEDIUM, PARTIAL_BLOCKAGE, status)
+        else:
+            self.alarms.clear(name)
+
+    def _show_status(self, status):
+        # only blocks whose color actually changes touch their canvas
+        block, color, img_path = self.statuses[status]
         for b in self.status_blocks:
             b.color = (0, 0, 0, 0)
-            b.border_color = b.border_color
-            b.update_canvas()
-        inst.color = bc
-        inst.border_color = bc
-        inst.update_canvas()
-        self.active_status = bc
+        block.color = color
+        block.border_color = color
+        self.active_status = color
         self._set_caution_image(img_path)
-        self.status_callback(label_text, img_path)
-
-        # cancel any existing buzzer schedules
-        if self.buzzer_event:
-            Clock.unschedule(self.buzzer_event)
-            self.buzzer_event = None
-        if self._buzzer_stop_ev:
-            Clock.unschedule(self._buzzer_stop_ev)
-            self._buzzer_stop_ev = None
-        stop_buzzer()
-
-        # start new pattern
-        if label_text.startswith("Full"):
-            # every 0.6s, start a 0.3s 330Hz beep
-            self.buzzer_event = Clock.schedule_interval(self._full_cycle, 0.6)
-            # kick off the first immediately
-            self._full_cycle(0)
-        elif label_text.startswith("Partial"):
-            # every 1.8s, start a 0.9s 440Hz beep
-            self.buzzer_event = Clock.schedule_interval(self._partial_cycle, 1.8)
-            self._partial_cycle(0)
-        else:
-            # No blockage → ensure silent
-            # cleanup()
-            stop_buzzer()
-
-    def _full_cycle(self, dt):
-        # start 330Hz beep, then schedule its stop in 0.3s
-        start_buzzer(330)
-        # cancel any pending stop, then schedule a fresh one
-        if self._buzzer_stop_ev:
-            Clock.unschedule(self._buzzer_stop_ev)
-        self._buzzer_stop_ev = Clock.schedule_once(lambda dt: stop_buzzer(), 0.3)
-
-    def _partial_cycle(self, dt):
-        # start 440Hz beep, then stop in 0.9s
-        start_buzzer(440)
-        if self._buzzer_stop_ev:
-            Clock.unschedule(self._buzzer_stop_ev)
-        self._buzzer_stop_ev = Clock.schedule_once(lambda dt: stop_buzzer(), 0.9)
 
     # ——— Two Toggles at Bottom ———
     def _build_toggle_card(self):
@@ -1095,24 +546,28 @@ class SidebarPanel(BoxLayout):
             inst.color = (0.2, 0.3, 0.2, 1)
             inst.border_color = (0.2, 0.3, 0.2, 1)
             lbl.text = f"{lt}\nOFF"
-        inst.update_canvas()
 
-    def _set_caution_image(self, path):
-        img = self._caution_image
-        img.source = path
-        img.opacity = 1
-        img.reload()
+    def _on_alarm_change(self, alarm):
+        self._show_status(alarm.data if alarm else "no")
         if self.blink_event:
             self.blink_event.cancel()
             self.blink_event = None
-        if "full" in path or "partial" in path:
-            self.blink_state = True
-            interval = 0.3 if "full" in path else 0.9
-            self.blink_event = Clock.schedule_interval(self._blink, interval)
+        if alarm is not None:
+            self._blink(0)
+
+    def _set_caution_image(self, path):
+        # A texture swap: every icon was decoded at startup
+        self.current_image_path = path
+        self._caution_image.texture = icon_texture(path)
+        self._caution_image.opacity = 1
 
     def _blink(self, dt):
-        self.blink_state = not self.blink_state
-        self._caution_image.opacity = 1 if self.blink_state else 0
+        # Show the icon while the buzzer sounds, re-reading the shared
+        # timeline at every edge so the blink never drifts from the beeps
+        sounding, remaining = self.alarms.phase(self.sequencer.clock())
+        self._caution_image.opacity = 1 if sounding else 0
+        if remaining != float("inf"):
+            self.blink_event = Clock.schedule_once(self._blink, remaining)
 
 
 class ResponsiveStackApp(App):
@@ -1125,6 +580,9 @@ class ResponsiveStackApp(App):
         Config.set("graphics", "height", "800")
         Config.set("graphics", "resizable", True)
 
+        # Decode all icons up front so alarms never wait on the SD card
+        preload_icons()
+
         # Main horizontal container
         root = BoxLayout(orientation="horizontal", spacing=dp(10), padding=dp(10))
 
@@ -1135,25 +593,135 @@ class ResponsiveStackApp(App):
             self.bg = Rectangle(size=root.size, pos=root.pos)
             root.bind(size=self._update_bg, pos=self._update_bg)
 
+        # Right side - Alert sidebar
+        self.sidebar = SidebarPanel()
+
         # Left side - Medical components
         components_layout = BoxLayout(orientation="vertical", spacing=dp(8))
 
-        # Create 4 components
-        components = [
-            RespiratoryComponent(size_hint_y=0.25),
-            CO2Component(size_hint_y=0.25),
-            SpO2Component(size_hint_y=0.25),
-            HeartRateComponent(size_hint_y=0.25),
-        ]
+        # One self-drawn card per vital sign
+        components = [VitalCard(**spec) for spec in VITALS]
+        rr, co2, spo2, hr = components
+        # HR is worked out from the pleth, not read from a sensor
+        sensors = [rr, co2, spo2]
+
+        # Sensors are read on background threads, optionally inside a worker
+        # process; each component drains the queue its source feeds. The
+        # simulated sources replay the synthetic streams the components were
+        # built with. A recorded session can feed the same queues instead;
+        # cards fed by real or recorded samples start empty rather than
+        # showing the synthetic prefill.
+        self.sensor_link = None
+        clock = time.monotonic
+        if REPLAY_DIR:
+            self.acquisition = SessionReplay(REPLAY_DIR, speed=REPLAY_SPEED)
+            # Samples keep their recorded spacing at any speed; time runs
+            # as fast as the playback, so rates and alarm delays hold
+            clock = self.acquisition.now
+            # Recorded sessions were filtered already, so get no filters
+            for component in sensors:
+                component.stream = self.acquisition.add(component.channel)
+                component.clear()
+        elif SENSOR_PORT:
+            port = SENSOR_PORT
+            if port == "sim":
+                self.sensor_link = SimulatedSensorLink(
+                    {component.channel: component.stream for component in sensors}
+                )
+                self.sensor_link.start()
+                port = self.sensor_link.port
+            # The board stamps samples with its own clock; the receiver maps
+            # them onto ours from the first frames, so recorded wall-clock
+            # times and alarm latencies hold for real hardware
+            self.acquisition = FrameReceiver(
+                open_serial(port, SENSOR_BAUD), time_offset=None
+            )
+            for component in sensors:
+                # Filtered on the receiver thread, and the window re-sized,
+                # for the rate the board sends rather than the card's
+                rate = functools.partial(self.acquisition.rate, component.channel)
+                component.stream = self.acquisition.add(
+                    component.channel, filters=SensorFilters(rate)
+                )
+                component.rate = rate
+                component.clear()
+        else:
+            if ACQUISITION_PROCESS:
+                self.acquisition = SharedMemoryPipeline()
+            else:
+                self.acquisition = Acquisition()
+            for component in sensors:
+                # Filtered on the acquisition thread or worker, off the UI
+                source = SimulatedSource(component.stream)
+                component.stream = self.acquisition.add(
+                    source, filters=sensor_filters(source.stream.rate)
+                )
+        self.acquisition.start()
+
+        # Every sample shown is also kept on disk, stamped with wall-clock time
+        self.recorder = None
+        if TREND_DIR and not REPLAY_DIR:
+            self.recorder = TrendRecorder(
+                TREND_DIR,
+                time_offset=time.time() - time.monotonic(),
+                pyramid=TrendPyramid(TREND_DIR, channels=len(VITALS)),
+            )
+            self.recorder.start()
+            for component in components:
+                component.sinks.append(self.recorder.record)
+
+        # RR and ETCO2 are read from the breaths found in the capnogram
+        self.breaths = BreathDetector()
+        co2.sinks.append(
+            lambda channel, times, values: self.breaths.update(times, values)
+        )
+        co2.reading = self.breaths.end_tidal
+        rr.reading = self.breaths.rate
+
+        # Each beat found in the pleth adds an HR sample to the HR card,
+        # which the scheduler updates after the SpO2 card in the same frame
+        self.pulses = PulseDetector()
+
+        # Baseline removal designed for the rate the pleth arrives at
+        def pleth_rate():
+            return 1 / spo2.sample_interval
+
+        if isinstance(self.acquisition, FrameReceiver):
+            pleth_rate = functools.partial(self.acquisition.rate, spo2.channel)
+        pleth = SensorFilters(pleth_rate, design=BaselineFilter)
+        hr.stream = SampleQueue()
+
+        def feed_pulses(channel, times, values):
+            beats, rates = self.pulses.update(times, pleth.process(values))
+            if len(beats):
+                hr.stream.put(beats, rates)
+
+        spo2.sinks.append(feed_pulses)
+        hr.reading = self.pulses.rate
+
+        # Alarm rules run on every chunk as the components consume it, and
+        # once a frame against the clock so a stopped stream still alarms
+        self.detector = None
+        if AUTO_ALARMS:
+            self.detector = AlarmDetector(
+                default_rules(rr=0, etco2=1, spo2=2, hr=3),
+                on_change=self.sidebar.on_detection,
+                clock=clock,
+            )
+            for component in components:
+                component.sinks.append(self.detector.feed)
 
+        # One frame-synchronous scheduler feeds and redraws all components
+        self.scheduler = FrameScheduler(budget=FRAME_BUDGET, clock=clock)
         for component in components:
             components_layout.add_widget(component)
-
-        # Right side - Alert sidebar
-        sidebar = SidebarPanel()
+            self.scheduler.add(component)
+        if self.detector is not None:
+            self.scheduler.add_ticker(self.detector)
+        self.scheduler.start()
 
         root.add_widget(components_layout)
-        root.add_widget(sidebar)
+        root.add_widget(self.sidebar)
 
         return root
 
@@ -1161,6 +729,17 @@ class ResponsiveStackApp(App):
         self.bg.pos = instance.pos
         self.bg.size = instance.size
 
+    def on_stop(self):
+        self.scheduler.stop()
+        self.acquisition.stop()
+        if self.sensor_link is not None:
+            self.sensor_link.stop()
+        self.sidebar.sequencer.shutdown()
+        # Releases the GPIO pin once nothing can sound it any more
+        buzzer.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
 
 if __name__ == "__main__":
     ResponsiveStackApp().run()
@@ -0,0 +1,331 @@
+import numpy as np
+
+# Decimate once a window holds more than this many samples per pixel
+POINTS_PER_PIXEL = 2
+
+
+class MinMaxDecimator:
+    """
+    Min/max bucket decimation of a RingBuffer window, cached per bucket.
+
+    Buckets are aligned to absolute sample indices rather than to the window,
+    so as the window scrolls a complete bucket keeps its min/max and never has
+    to be rescanned. Each call only computes buckets completed since the last
+    call plus the partial buckets at either edge of the window.
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self._bucket = 0
+        self._next = 0  # first bucket id not cached yet
+        self._count = 0
+        self._slots = 0
+        self._mins = self._maxs = np.empty(0)
+        self._min_pos = self._max_pos = np.empty(0, dtype=np.int64)
+
+    def _reset(self, buffer, bucket):
+        self._buffer = buffer
+        self._bucket = bucket
+        self._slots = buffer.capacity // bucket + 2
+        self._mins = np.empty(self._slots)
+        self._maxs = np.empty(self._slots)
+        self._min_pos = np.empty(self._slots, dtype=np.int64)
+        self._max_pos = np.empty(self._slots, dtype=np.int64)
+        start = buffer.count - len(buffer)
+        self._next = -(-start // bucket)
+
+    def _scan(self, buffer, start, stop):
+        # Returns per-row min, max and their absolute positions
+        b = self._bucket
+        rows = buffer.span(start, stop).reshape(-1, b)
+        base = start + np.arange(len(rows)) * b
+        lo = rows.argmin(axis=1)
+        hi = rows.argmax(axis=1)
+        idx = np.arange(len(rows))
+        return rows[idx, lo], rows[idx, hi], base + lo, base + hi
+
+    def _scan_partial(self, buffer, start, stop):
+        seg = buffer.span(start, stop)
+        lo = int(seg.argmin())
+        hi = int(seg.argmax())
+        return seg[lo], seg[hi], start + lo, start + hi
+
+    def decimate(self, buffer, bucket):
+        """
+        Reduce `buffer` to the min and max of every `bucket` samples.
+
+        Returns (positions, values): two arrays with two points per bucket,
+        in time order, where positions are sample offsets from the oldest
+        sample in the window.
+        """
+        count = buffer.count
+        n = len(buffer)
+        start = count - n
+        stale = buffer is not self._buffer or bucket != self._bucket
+        if stale or count < self._count:
+            self._reset(buffer, bucket)
+        self._count = count
+
+        slots = self._slots
+        first = start // bucket
+        last = (count - 1) // bucket
+        full_lo = -(-start // bucket)  # first bucket wholly inside the window
+        full_hi = count // bucket  # buckets below this are complete
+
+        lo = max(self._next, full_lo)
+        if full_hi > lo:
+            mins, maxs, min_pos, max_pos = self._scan(
+                buffer, lo * bucket, full_hi * bucket
+            )
+            ids = np.arange(lo, full_hi) % slots
+            self._mins[ids] = mins
+            self._maxs[ids] = maxs
+            self._min_pos[ids] = min_pos
+            self._max_pos[ids] = max_pos
+        self._next = max(self._next, full_hi)
+
+        ids = np.arange(first, last + 1) % slots
+        mins = self._mins[ids]
+        maxs = self._maxs[ids]
+        min_pos = self._min_pos[ids]
+        max_pos = self._max_pos[ids]
+
+        # Edge buckets only partly inside the window are rescanned directly
+        if first < full_lo:
+            head = self._scan_partial(buffer, start, min((first + 1) * bucket, count))
+            mins[0], maxs[0], min_pos[0], max_pos[0] = head
+        if last >= full_hi and (last > first or first >= full_lo):
+            tail = self._scan_partial(buffer, max(last * bucket, start), count)
+            mins[-1], maxs[-1], min_pos[-1], max_pos[-1] = tail
+
+        min_first = min_pos <= max_pos
+        positions = np.empty(2 * len(ids), dtype=np.int64)
+        values = np.empty(2 * len(ids))
+        positions[0::2] = np.where(min_first, min_pos, max_pos)
+        positions[1::2] = np.where(min_first, max_pos, min_pos)
+        values[0::2] = np.where(min_first, mins, maxs)
+        values[1::2] = np.where(min_first, maxs, mins)
+        positions -= start
+        return positions, values
+
+
+class WaveformPlot:
+    """
+    Vectorized sample-to-screen transform for a waveform graph.
+
+    Holds a preallocated interleaved [x0, y0, x1, y1, ...] float buffer. The
+    x-coordinates only depend on the sample count and the widget geometry,
+    so they are cached and recomputed on resize; each frame only fills the
+    y-coordinates with one batched NumPy expression.
+
+    Windows holding more than POINTS_PER_PIXEL samples per pixel of `width`
+    are first reduced by a MinMaxDecimator, which keeps peaks and troughs.
+    """
+
+    def __init__(self):
+        self._samples = np.empty(0)
+        self._times = np.empty(0)
+        self._points = np.empty(0, dtype=np.float32)
+        self._x_key = None
+        self._decimator = MinMaxDecimator()
+
+    def _ensure_capacity(self, n):
+        # Only ever grows, so the decimated point count can vary per frame
+        if len(self._points) < 2 * n:
+            self._points = np.empty(2 * n, dtype=np.float32)
+            self._x_key = None
+
+    def points(self, buffer, x0, width, baseline, amplitude, times=None, span=None):
+        """
+        Map `buffer` (a RingBuffer) onto the graph and return the vertices.
+
+        Samples are spread evenly across `width` starting at `x0`, and each
+        value is placed at baseline + ((val - 100) / 10) * amplitude. The
+        result is a memoryview over the internal buffer, which Line.points
+        accepts directly; it is overwritten on the next call.
+
+        If `times` (a RingBuffer of timestamps filled in step with `buffer`)
+        is given, samples are placed by time instead: the newest sample sits
+        at the right edge and `span` seconds cover the full width.
+        """
+        n = len(buffer)
+        pixels = max(1, int(width))
+        if n > POINTS_PER_PIXEL * pixels:
+            return self._decimated_points(
+                buffer, pixels, x0, width, baseline, amplitude, times, span
+            )
+
+        self._ensure_capacity(n)
+        if len(self._samples) != n:
+            self._samples = np.empty(n)
+            self._times = np.empty(n)
+            self._x_key = None
+        points = self._points[: 2 * n]
+        if not n:
+            return points.data
+
+        if times is not None:
+            t = times.values(out=self._times)
+            points[0::2] = self._time_to_x(t, times.last(), x0, width, span)
+            self._x_key = None
+        elif (n, x0, width) != self._x_key:
+            points[0::2] = x0 + np.arange(n) * (width / n)
+            self._x_key = (n, x0, width)
+
+        samples = buffer.values(out=self._samples)
+        samples -= 100
+        samples *= amplitude / 10
+        samples += baseline
+        points[1::2] = samples
+        return points.data
+
+    def _decimated_points(
+        self, buffer, pixels, x0, width, baseline, amplitude, times, span
+    ):
+        n = len(buffer)
+        # One min/max pair per pixel column
+        bucket = -(-n // pixels)
+        positions, values = self._decimator.decimate(buffer, bucket)
+        m = len(values)
+        self._ensure_capacity(m)
+        self._x_key = None
+        points = self._points[: 2 * m]
+        if times is not None:
+            t = times.take(positions + (buffer.count - n))
+            points[0::2] = self._time_to_x(t, times.last(), x0, width, span)
+        else:
+            points[0::2] = x0 + positions * (width / n)
+        values -= 100
+        values *= amplitude / 10
+        values += baseline
+        points[1::2] = values
+        return points.data
+
+    @staticmethod
+    def _time_to_x(t, newest, x0, width, span):
+        # Right edge is the newest sample; anything older than span is pinned
+        x = t - newest
+        x *= width / span
+        x += x0 + width
+        return np.maximum(x, x0, out=x)
+
+
+class SweepPlot:
+    """
+    Sweep-mode (erase-bar) waveform, drawn as a Kivy Mesh in "lines" mode.
+
+    The graph is a fixed row of columns and sample k always lands in column
+    (k // bucket) % columns, so a cursor sweeps left to right and overwrites
+    the previous lap. Vertex and index buffers are allocated once per
+    geometry; each call only rewrites the columns that received new samples
+    and moves a small gap (`gap`, a fraction of the width) ahead of the
+    cursor by turning the segments under it into degenerate ones. Work per
+    frame is proportional to the new samples, not to the window.
+
+    Each column carries two vertices, the min and max of its samples, so
+    windows denser than POINTS_PER_PIXEL samples per pixel are reduced the
+    same way WaveformPlot reduces them. Values are placed like
+    WaveformPlot.points: baseline + ((val - 100) / 10) * amplitude.
+    """
+
+    def __init__(self, gap=0.03):
+        self.gap = gap
+        self._key = None
+        self._count = 0
+
+    def _reset(self, buffer, x0, width, baseline, amplitude):
+        pixels = max(1, int(width))
+        capacity = buffer.capacity
+        if capacity > POINTS_PER_PIXEL * pixels:
+            bucket = -(-capacity // pixels)
+        else:
+            bucket = 1
+        columns = -(-capacity // bucket)
+        self._key = (buffer, x0, width, baseline, amplitude)
+        self._bucket = bucket
+        self._columns = columns
+        self._gap = max(1, int(columns * self.gap))
+        self._scale = amplitude / 10
+        self._offset = baseline - 100 * self._scale
+
+        # Vertices are (x, y, u, v); column c owns vertices 2c and 2c + 1
+        self._vertices = np.zeros(8 * columns, dtype=np.float32)
+        x = x0 + np.arange(columns) * (width / columns)
+        self._vertices[0::8] = x
+        self._vertices[4::8] = x
+        # Segment s joins vertices s and s + 1; hidden ones collapse onto s
+        segments = 2 * columns - 1
+        self._indices = np.empty(2 * segments, dtype=np.uint16)
+        self._indices[0::2] = np.arange(segments)
+        self._indices[1::2] = np.arange(segments)
+        self._mins = np.empty(columns)
+        self._maxs = np.empty(columns)
+        self._hidden = (0, segments)  # nothing drawn until samples arrive
+
+        start = buffer.count - len(buffer)
+        self._first = start
+        self._count = start
+
+    def _set_segments(self, lo, hi, visible):
+        # Segments lo..hi-1, counted modulo 2 * columns so they can wrap;
+        # the last one would join the right edge to the left and never exists
+        lap = 2 * self._columns
+        total = lap - 1
+        for a, b in ((lo, min(hi, lap)), (0, hi - lap)):
+            b = min(b, total)
+            if b > a:
+                seg = np.arange(a, b, dtype=np.uint16)
+                self._indices[2 * a + 1 : 2 * b : 2] = seg + 1 if visible else seg
+
+    def _write(self, buffer, start, stop):
+        bucket, columns = self._bucket, self._columns
+        values = buffer.span(start, stop)
+        cols = np.arange(start, stop) // bucket
+        breaks = np.flatnonzero(np.diff(cols)) + 1
+        edges = np.concatenate(([0], breaks))
+        mins = np.minimum.reduceat(values, edges)
+        maxs = np.maximum.reduceat(values, edges)
+        ids = cols[edges] % columns
+        # A column already started on an earlier call keeps its extremes
+        if start % bucket and start > self._first:
+            mins[0] = min(mins[0], self._mins[ids[0]])
+            maxs[0] = max(maxs[0], self._maxs[ids[0]])
+        self._mins[ids] = mins
+        self._maxs[ids] = maxs
+        self._vertices[8 * ids + 1] = mins * self._scale + self._offset
+        self._vertices[8 * ids + 5] = maxs * self._scale + self._offset
+
+    def update(self, buffer, x0, width, baseline, amplitude):
+        """
+        Draw the samples that arrived since the last call.
+
+        Returns (vertices, indices) as memoryviews over the persistent
+        buffers, ready to assign to Mesh.vertices and Mesh.indices.
+        """
+        key = (buffer, x0, width, baseline, amplitude)
+        count = buffer.count
+        if key != self._key or count < self._count:
+            self._reset(buffer, x0, width, baseline, amplitude)
+        bucket, columns = self._bucket, self._columns
+        # Samples the buffer no longer holds are skipped; a long stall
+        # redraws at most the last lap
+        start = max(self._count, count - len(buffer), count - bucket * columns)
+        if start > self._count:
+            self._first = start  # what is left of the old lap is stale
+        if count > start:
+            self._write(buffer, start, count)
+        self._count = count
+
+        # Hide the gap ahead of the cursor, plus columns with no data yet
+        if count > self._first:
+            cursor = (count - 1) // bucket
+            filled = min(columns, cursor - self._first // bucket + 1)
+            gap = max(self._gap, columns - filled)
+            lo = (2 * ((cursor + 1) % columns) - 1) % (2 * columns)
+            hidden = (lo, 2 * gap + 1)
+            if hidden != self._hidden:
+                old_lo, old_len = self._hidden
+                self._set_segments(old_lo, old_lo + old_len, True)
+                self._set_segments(hidden[0], hidden[0] + hidden[1], False)
+                self._hidden = hidden
+        return self._vertices.data, self._indices.data
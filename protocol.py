@@ -0,0 +1,312 @@
+import os
+import pty
+import select
+import struct
+import termios
+import threading
+import time
+import tty
+import zlib
+
+import numpy as np
+
+from acquisition import SampleQueue
+
+# Frame layout, little-endian:
+#   header   magic "\xa5Z", version, channel, kind, flags, sample count,
+#            sequence number, first sample time (s), sample interval (s),
+#            scale (value = raw * scale)
+#   payload  count samples of the kind's type
+#   crc      CRC-32 of header and payload
+MAGIC = b"\xa5Z"
+VERSION = 1
+HEADER = struct.Struct("<2sBBBBHHdff")
+CRC = struct.Struct("<I")
+KINDS = {0: np.dtype("<i2"), 1: np.dtype("<f4")}
+INT16, FLOAT32 = KINDS
+MAX_SAMPLES = 4096
+
+
+def encode_frame(channel, t0, interval, values, kind=INT16, scale=1.0, seq=0):
+    """One frame carrying `values`, sampled every `interval` s from `t0`."""
+    values = np.asarray(values, np.float64)
+    if len(values) > MAX_SAMPLES:
+        raise ValueError(f"at most {MAX_SAMPLES} samples per frame")
+    if kind == INT16:
+        raw = np.round(values / scale)
+        # A wrapped int16 would decode as a plausible but wrong vital
+        if len(raw) and not (np.all(raw >= -32768) and np.all(raw <= 32767)):
+            raise ValueError(
+                f"values outside {-32768 * scale:g}..{32767 * scale:g} "
+                f"do not fit int16 at scale {scale:g}"
+            )
+        payload = raw.astype(KINDS[kind]).tobytes()
+    else:
+        payload = (values / scale).astype(KINDS[kind]).tobytes()
+    header = HEADER.pack(
+        MAGIC, VERSION, channel, kind, 0, len(values), seq & 0xFFFF, t0, interval, scale
+    )
+    crc = zlib.crc32(payload, zlib.crc32(header))
+    return header + payload + CRC.pack(crc)
+
+
+def open_serial(port, baud=115200):
+    """
+    Open a serial port (or pty) for reading frames: raw mode, so the line
+    discipline neither echoes, buffers lines nor rewrites bytes, at `baud`
+    bits/s, 8N1 with the modem lines ignored.
+    """
+    speed = getattr(termios, f"B{baud}", None)
+    if speed is None:
+        raise ValueError(f"unsupported baud rate {baud}")
+    fd = os.open(port, os.O_RDWR | os.O_NOCTTY)
+    try:
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        attrs[2] |= termios.CLOCAL | termios.CREAD
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        termios.tcflush(fd, termios.TCIFLUSH)
+    except BaseException:
+        os.close(fd)
+        raise
+    return open(fd, "rb", buffering=0)
+
+
+class FrameReader:
+    """
+    Incremental parser for a byte stream of frames.
+
+    Bytes land in one preallocated buffer, through `fill(readinto)` straight
+    from the device or `feed(data)` for bytes already in hand. `parse()`
+    returns (channel, times, values) for every complete frame: the header
+    is unpacked in place, the CRC is computed over a memoryview and the
+    payload is read with np.frombuffer, so the only copy is the one that
+    scales it to float64 samples. On a bad header or CRC the reader
+    resyncs on the next magic; `crc_errors`, `bad_frames` and `lost`
+    (frames missing from a channel's sequence) count what went wrong.
+    `intervals` holds each channel's sample interval, from its last frame.
+    """
+
+    def __init__(self, size=1 << 16):
+        if size < HEADER.size + MAX_SAMPLES * 4 + CRC.size:
+            raise ValueError("buffer cannot hold a full frame")
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._end = 0
+        self._next_seq = {}
+        self.intervals = {}
+        self.crc_errors = 0
+        self.bad_frames = 0
+        self.lost = 0
+
+    def fill(self, readinto):
+        """Read once with `readinto(buffer)` into the free space; return bytes read."""
+        n = readinto(self._view[self._end :]) or 0
+        self._end += n
+        return n
+
+    def feed(self, data):
+        n = len(data)
+        self._view[self._end : self._end + n] = data
+        self._end += n
+
+    def parse(self):
+        frames = []
+        buf = self._buf
+        pos = 0
+        while True:
+            start = buf.find(MAGIC, pos, self._end)
+            if start < 0:
+                # The last byte may be the first half of a magic
+                pos = max(pos, self._end - 1)
+                break
+            if self._end - start < HEADER.size:
+                pos = start
+                break
+            _, version, channel, kind, _, count, seq, t0, interval, scale = (
+                HEADER.unpack_from(buf, start)
+            )
+            dtype = KINDS.get(kind)
+            if version != VERSION or dtype is None or count > MAX_SAMPLES:
+                self.bad_frames += 1
+                pos = start + 1
+                continue
+            body = HEADER.size + count * dtype.itemsize
+            if self._end - start < body + CRC.size:
+                pos = start
+                break
+            (crc,) = CRC.unpack_from(buf, start + body)
+            if zlib.crc32(self._view[start : start + body]) != crc:
+                self.crc_errors += 1
+                pos = start + 1
+                continue
+
+            expected = self._next_seq.get(channel)
+            if expected is not None:
+                self.lost += (seq - expected) & 0xFFFF
+            self._next_seq[channel] = (seq + 1) & 0xFFFF
+            self.intervals[channel] = interval
+            raw = np.frombuffer(buf, dtype, count, start + HEADER.size)
+            values = np.multiply(raw, scale, dtype=np.float64)
+            times = t0 + np.arange(count) * float(interval)
+            frames.append((channel, times, values))
+            pos = start + body + CRC.size
+
+        # Move the unparsed tail to the front; the buffer never resizes
+        left = self._end - pos
+        self._view[:left] = self._view[pos : self._end]
+        self._end = left
+        return frames
+
+
+class FrameReceiver(threading.Thread):
+    """
+    Reads frames from a serial port, pty or socket into per-channel
+    sample queues.
+
+    `stream` is anything with `fileno()` and `readinto()`, e.g.
+    `open_serial(port)` or `socket.makefile("rb", buffering=0)`.
+    `add(channel)` returns the SampleQueue to use as that component's
+    stream, as Acquisition.add does, with `filters` run on this thread;
+    `rate(channel)` is the sample rate the sender reports for it. The
+    thread stops at end of stream.
+
+    Frame times are in the sender's clock; `time_offset` maps them onto
+    `clock`. Left as None it is estimated from the first `calibration`
+    frames as the smallest (arrival time - newest sample time), i.e. the
+    offset seen by the least delayed frame, and then held fixed. Those
+    frames are held back until it is, so every sample is mapped with the
+    same offset and times never step back.
+    """
+
+    def __init__(
+        self,
+        stream,
+        time_offset=None,
+        calibration=50,
+        poll_interval=0.1,
+        clock=time.monotonic,
+    ):
+        super().__init__(name="frame-receiver", daemon=True)
+        self.stream = stream
+        self.time_offset = time_offset
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._calibrating = calibration if time_offset is None else 0
+        self._held = []
+        self.reader = FrameReader()
+        self._queues = {}
+        self._filters = {}
+        self._stopping = threading.Event()
+
+    def add(self, channel, max_batches=256, filters=None):
+        queue = SampleQueue(max_batches)
+        self._queues[channel] = queue
+        if filters is not None:
+            self._filters[channel] = filters
+        return queue
+
+    def rate(self, channel):
+        """Samples/s on `channel` per its last frame, or None before one."""
+        interval = self.reader.intervals.get(channel)
+        return 1 / interval if interval else None
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        try:
+            while not self._stopping.is_set():
+                ready, _, _ = select.select([self.stream], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                try:
+                    n = self.reader.fill(self.stream.readinto)
+                except OSError:
+                    n = 0  # e.g. the other end of a pty went away
+                if not n:
+                    return
+                arrival = self.clock()
+                frames = self.reader.parse()
+                if self._calibrating:
+                    for _, times, _ in frames:
+                        if len(times):
+                            offset = arrival - times[-1]
+                            if self.time_offset is None or offset < self.time_offset:
+                                self.time_offset = offset
+                    self._held += frames
+                    self._calibrating = max(0, self._calibrating - len(frames))
+                    if self._calibrating:
+                        continue
+                    frames, self._held = self._held, []
+                self._deliver(frames)
+        finally:
+            # A stream that ends while calibrating still delivers its frames
+            self._deliver(self._held)
+            self._held = []
+            self.stream.close()
+
+    def _deliver(self, frames):
+        for channel, times, values in frames:
+            queue = self._queues.get(channel)
+            if queue is None:
+                continue
+            if self.time_offset:
+                times += self.time_offset
+            filters = self._filters.get(channel)
+            if filters is not None:
+                values = filters.process(values)
+            queue.put(times, values)
+
+
+class SimulatedSensorLink(threading.Thread):
+    """
+    Stands in for the sensor board: sends the samples of synthetic streams
+    as frames into a pty, in batches every `batch_interval` seconds.
+
+    `streams` maps a channel id to a SyntheticStream. Open `port` like a
+    serial device (FrameReceiver(open_serial(link.port))) to
+    read them back. Samples are sent as int16 scaled by `scale`.
+    """
+
+    def __init__(self, streams, batch_interval=0.02, scale=0.01, clock=time.monotonic):
+        super().__init__(name="simulated-sensor-link", daemon=True)
+        self.streams = streams
+        self.batch_interval = batch_interval
+        self.scale = scale
+        self.clock = clock
+        self._master, slave = pty.openpty()
+        # Raw mode, so the line discipline passes bytes through untouched
+        tty.setraw(self._master)
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave  # held open so the port stays usable until stop()
+        self._stopping = threading.Event()
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+        os.close(self._master)
+        os.close(self._slave)
+
+    def run(self):
+        seq = {channel: 0 for channel in self.streams}
+        while not self._stopping.wait(self.batch_interval):
+            now = self.clock()
+            for channel, stream in self.streams.items():
+                times, values = stream.read(now)
+                for i in range(0, len(values), MAX_SAMPLES):
+                    frame = encode_frame(
+                        channel,
+                        times[i],
+                        1 / stream.rate,
+                        values[i : i + MAX_SAMPLES],
+                        scale=self.scale,
+                        seq=seq[channel],
+                    )
+                    seq[channel] += 1
+                    os.write(self._master, frame)
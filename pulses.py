@@ -0,0 +1,150 @@
+from collections import deque
+
+import numpy as np
+
+
+class PulseDetector:
+    """
+    Finds heartbeats in a streaming pleth waveform and reports heart rate.
+
+    Local maxima are found a chunk at a time with NumPy; only those are
+    looked at one by one. A maximum is a beat when it rises at least
+    `fraction` of the running pulse amplitude above the lowest sample since
+    the previous beat. The amplitude is a moving average of accepted beat
+    heights, so the threshold follows the signal; after `search_back`
+    times the mean interval without a beat it is halved, so a weakening
+    pulse is picked up again. A beat stays pending for `refractory`
+    seconds and a higher maximum in that time replaces it, which keeps
+    dicrotic notches and noise on the upstroke from counting twice.
+
+    Heart rate is the mean over the last `beats` beat-to-beat intervals,
+    kept as a running sum. Intervals outside `min_interval`..`max_interval`
+    are not counted. When no beat has come for `max_interval` (below
+    25 bpm: asystole, severe bradycardia or a lost pulse) the detector
+    reports 0 bpm, once per `max_interval`, until beats resume; the
+    average then starts afresh.
+    """
+
+    def __init__(
+        self,
+        fraction=0.5,
+        refractory=0.3,
+        beats=8,
+        search_back=1.5,
+        min_interval=60 / 240,
+        max_interval=60 / 25,
+    ):
+        self.fraction = fraction
+        self.refractory = refractory
+        self.search_back = search_back
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._amplitude = None
+        self._trough = np.inf  # lowest sample since the last beat
+        self._pending = None  # (time, value, height) of the beat on hold
+        self._last_beat = None
+        self._silent_since = None  # last beat or 0 bpm report
+        self._silent = False
+        self._now = None
+        self._tail = np.empty(0)  # last two samples of the previous chunk
+        self._tail_times = np.empty(0)
+        self._intervals = deque(maxlen=beats)
+        self._interval_sum = 0.0
+
+    def update(self, times, values):
+        """
+        Fold in a chunk; return (beat times, heart rates) for the beats it
+        confirmed, as arrays.
+        """
+        beats, rates = [], []
+        if not len(values):
+            return np.asarray(beats), np.asarray(rates)
+        self._now = times[-1]
+        if self._silent_since is None:
+            self._silent_since = times[0]
+        # Carry two samples over so maxima on a chunk boundary are found
+        v = np.concatenate((self._tail, values))
+        t = np.concatenate((self._tail_times, times))
+        peaks = np.flatnonzero((v[1:-1] > v[:-2]) & (v[1:-1] >= v[2:])) + 1
+        begin = 0
+        for i in peaks:
+            self._trough = min(self._trough, v[begin:i].min(initial=np.inf))
+            begin = i
+            self._candidate(t[i], v[i], beats, rates)
+        self._trough = min(self._trough, v[begin:].min())
+        self._tail, self._tail_times = v[-2:], t[-2:]
+        if self._pending is not None and t[-1] - self._pending[0] >= self.refractory:
+            self._confirm(beats, rates)
+        if (
+            self._pending is None
+            and self._now - self._silent_since >= self.max_interval
+        ):
+            # No pulse: say so, rather than keep showing the last rate
+            self._silent = True
+            self._silent_since = self._now
+            self._intervals.clear()
+            self._interval_sum = 0.0
+            beats.append(self._now)
+            rates.append(0.0)
+        return np.asarray(beats), np.asarray(rates)
+
+    def _candidate(self, t, value, beats, rates):
+        pending = self._pending
+        if pending is not None:
+            if t - pending[0] < self.refractory:
+                if value > pending[1]:
+                    # Same beat, higher crest; its trough is unchanged
+                    self._pending = (t, value, pending[2] + value - pending[1])
+                    self._trough = value
+                return
+            self._confirm(beats, rates)
+
+        height = value - self._trough
+        threshold = 0.0
+        if self._amplitude is not None:
+            threshold = self.fraction * self._amplitude
+            mean = self._mean_interval()
+            if mean and t - self._last_beat > self.search_back * mean:
+                threshold /= 2
+        if height > threshold:
+            self._pending = (t, value, height)
+            self._trough = value
+
+    def _confirm(self, beats, rates):
+        t, value, height = self._pending
+        self._pending = None
+        if self._amplitude is None:
+            self._amplitude = height
+        else:
+            self._amplitude += (height - self._amplitude) / 8
+        if self._last_beat is not None:
+            interval = t - self._last_beat
+            if interval > self.max_interval:
+                # The signal was lost; start the average afresh
+                self._intervals.clear()
+                self._interval_sum = 0.0
+            elif interval >= self.min_interval:
+                if len(self._intervals) == self._intervals.maxlen:
+                    self._interval_sum -= self._intervals[0]
+                self._intervals.append(interval)
+                self._interval_sum += interval
+                beats.append(t)
+                rates.append(60 / self._mean_interval())
+        self._last_beat = t
+        self._silent_since = t
+        self._silent = False
+
+    def _mean_interval(self):
+        if not self._intervals:
+            return None
+        return self._interval_sum / len(self._intervals)
+
+    def rate(self):
+        """
+        Heart rate over the recent beats, 0 while there is no pulse, or
+        None until two beats in a row have been seen.
+        """
+        if self._silent:
+            return 0
+        mean = self._mean_interval()
+        return None if mean is None else 60 / mean
@@ -0,0 +1,230 @@
+import glob
+import logging
+import mmap
+import os
+import threading
+
+import numpy as np
+
+# One sample on disk: 16 bytes, little-endian
+RECORD = np.dtype([("t", "<f8"), ("channel", "<u4"), ("value", "<f4")])
+# Segment header, padded to 64 bytes; `count` is how many records are durable
+HEADER = np.dtype(
+    [
+        ("magic", "S4"),
+        ("version", "<u4"),
+        ("record_size", "<u4"),
+        ("pad", "<u4"),
+        ("capacity", "<u8"),
+        ("count", "<u8"),
+        ("reserved", "V32"),
+    ]
+)
+MAGIC = b"TRND"
+VERSION = 1
+SEGMENT_GLOB = "segment-*.trend"
+
+log = logging.getLogger(__name__)
+
+
+def _segment_path(directory, seq):
+    return os.path.join(directory, f"segment-{seq:08d}.trend")
+
+
+def _segment_seq(path):
+    return int(os.path.basename(path)[len("segment-") :].split(".")[0])
+
+
+def segment_paths(directory):
+    """Segment files in `directory`, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_GLOB)))
+
+
+def read_segment(path):
+    """Copy of the durable records in one segment file."""
+    header = np.fromfile(path, HEADER, count=1)[0]
+    if header["magic"] != MAGIC or header["record_size"] != RECORD.itemsize:
+        raise ValueError(f"{path} is not a trend segment")
+    return np.fromfile(path, RECORD, count=int(header["count"]), offset=HEADER.itemsize)
+
+
+class _Segment:
+    """A preallocated segment file mapped into memory."""
+
+    def __init__(self, path, capacity):
+        self.path = path
+        size = HEADER.itemsize + capacity * RECORD.itemsize
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, "posix_fallocate"):
+                # Reserve real blocks now so appends never fragment or fail
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.header = np.ndarray((), HEADER, buffer=self._mm)
+        self.header["magic"] = MAGIC
+        self.header["version"] = VERSION
+        self.header["record_size"] = RECORD.itemsize
+        self.header["capacity"] = capacity
+        self.header["count"] = 0
+        self.records = np.ndarray(capacity, RECORD, self._mm, HEADER.itemsize)
+        self.capacity = capacity
+        self.count = 0  # records written, durable or not
+
+    def sync(self, count):
+        # Records first, then the header that makes them visible to readers
+        self._mm.flush()
+        self.header["count"] = count
+        # The header's page, which is all of a segment under one page long
+        self._mm.flush(0, min(mmap.PAGESIZE, len(self._mm)))
+
+    def close(self):
+        self.sync(self.count)
+        del self.header, self.records
+        self._mm.close()
+
+
+class TrendRecorder:
+    """
+    Append-only recorder of (timestamp, channel, value) samples.
+
+    Samples go into preallocated, memory-mapped segment files of
+    `segment_records` fixed-width RECORDs, so `record()` is a strided copy
+    into memory with no system call. A background thread msyncs on a
+    schedule (every `flush_interval` seconds) rather than per sample, which
+    spares the SD card, and prepares the next segment ahead of time so a
+    full segment rotates without touching the disk on the caller's thread.
+    At most `max_segments` segment files are kept; the oldest are deleted.
+
+    Only samples covered by a segment header's `count` survive a power
+    cut, i.e. at most `flush_interval` seconds are at risk. `record()` is
+    meant to be called from one thread. `time_offset` is added to every
+    timestamp, e.g. to store monotonic sample times as wall-clock ones.
+
+    A `pyramid` (TrendPyramid) is fed every recorded sample, flushed with
+    the segments and closed with the recorder.
+    """
+
+    def __init__(
+        self,
+        directory,
+        segment_records=1 << 20,
+        max_segments=64,
+        flush_interval=5.0,
+        time_offset=0.0,
+        pyramid=None,
+    ):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+        self.time_offset = time_offset
+        self.pyramid = pyramid
+        os.makedirs(directory, exist_ok=True)
+
+        # A restart continues after the newest segment instead of reopening it
+        existing = segment_paths(directory)
+        self._seq = _segment_seq(existing[-1]) + 1 if existing else 0
+        self._lock = threading.Lock()  # guards segment handoff, not copies
+        self._current = self._open_segment()
+        self._spare = None
+        self._retired = []
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _open_segment(self):
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+        return _Segment(_segment_path(self.directory, seq), self.segment_records)
+
+    def record(self, channel, times, values):
+        """Append samples for one channel; `times` and `values` align."""
+        n = len(values)
+        done = 0
+        while done < n:
+            segment = self._current
+            k = min(segment.capacity - segment.count, n - done)
+            if k == 0:
+                self._rotate()
+                continue
+            rows = segment.records[segment.count : segment.count + k]
+            rows["t"] = times[done : done + k]
+            rows["t"] += self.time_offset
+            if self.pyramid is not None:
+                self.pyramid.add(channel, rows["t"], values[done : done + k])
+            rows["channel"] = channel
+            rows["value"] = values[done : done + k]
+            segment.count += k
+            done += k
+
+    def _rotate(self):
+        with self._lock:
+            spare, self._spare = self._spare, None
+        if spare is None:
+            # The flush thread fell behind or is not running
+            spare = self._open_segment()
+        # flush() must never see a retired segment as current
+        with self._lock:
+            self._retired.append(self._current)
+            self._current = spare
+
+    def flush(self):
+        """Make every recorded sample durable; called by the flush thread."""
+        with self._lock:
+            retired, self._retired = self._retired, []
+            current = self._current
+            count = current.count
+        for segment in retired:
+            segment.close()
+        current.sync(count)
+        if self.pyramid is not None:
+            self.pyramid.flush()
+        if self._spare is None:
+            spare = self._open_segment()
+            with self._lock:
+                self._spare = spare
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        # The spare holds nothing yet and does not count against the limit
+        spare = self._spare.path if self._spare is not None else None
+        paths = [p for p in segment_paths(self.directory) if p != spare]
+        for path in paths[: max(0, len(paths) - self.max_segments)]:
+            if path != self._current.path:
+                os.remove(path)
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Keep flushing; one failed msync must not end durability
+                log.exception("trend flush failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="trend-recorder", daemon=True
+            )
+            self._thread.start()
+
+    def close(self, timeout=5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for segment in (*self._retired, self._current):
+            segment.close()
+        self._retired = []
+        if self._spare is not None:
+            # Never written to; drop it rather than leave an empty segment
+            spare, self._spare = self._spare, None
+            spare.close()
+            os.remove(spare.path)
+        self._enforce_retention()
+        if self.pyramid is not None:
+            self.pyramid.close()
@@ -0,0 +1,189 @@
+import bisect
+import os
+import threading
+import time
+
+import numpy as np
+
+from acquisition import SampleQueue
+from recorder import HEADER, RECORD, TrendRecorder, segment_paths
+from streams import SyntheticStream
+
+
+class SessionIndex:
+    """
+    Time index over the segment files of a recorded session.
+
+    Holds each segment's durable record count and first and last timestamps,
+    read from its header and two records, so opening a session reads
+    almost nothing. `locate(t)` finds the first record at or after `t`
+    with a binary search over a read-only map of one segment. Records are
+    in recording order, which is time order to within one frame's batch.
+    """
+
+    def __init__(self, directory):
+        self.segments = []  # (path, count, first t, last t)
+        for path in segment_paths(directory):
+            count = int(np.fromfile(path, HEADER, count=1)[0]["count"])
+            if count:
+                records = self._map(path, count)
+                first, last = float(records[0]["t"]), float(records[-1]["t"])
+                self.segments.append((path, count, first, last))
+        if not self.segments:
+            raise ValueError(f"no recorded samples in {directory}")
+        self.start = self.segments[0][2]
+        self.end = self.segments[-1][3]
+
+    @staticmethod
+    def _map(path, count):
+        return np.memmap(path, RECORD, "r", HEADER.itemsize, (count,))
+
+    def locate(self, t):
+        """(segment number, record offset) of the first record at or after t."""
+        lasts = [last for _, _, _, last in self.segments]
+        seg = bisect.bisect_left(lasts, t)
+        if seg == len(self.segments):
+            return seg, 0
+        path, count, _, _ = self.segments[seg]
+        records = self._map(path, count)
+        return seg, bisect.bisect_left(range(count), t, key=lambda i: records[i]["t"])
+
+    def chunks(self, seg=0, offset=0, size=4096):
+        """
+        Yield the records from (seg, offset) on, `size` at a time, each
+        chunk sorted by time. Records are written a channel's batch at a
+        time, so unsorted a chunk runs ch0 t0..tn, ch1 t0..tn, ...; the
+        stable sort keeps each channel's samples in order.
+        """
+        for path, count, _, _ in self.segments[seg:]:
+            while offset < count:
+                n = min(size, count - offset)
+                records = np.fromfile(
+                    path, RECORD, n, offset=HEADER.itemsize + offset * RECORD.itemsize
+                )
+                yield records[np.argsort(records["t"], kind="stable")]
+                offset += n
+            offset = 0
+
+
+class SessionReplay(threading.Thread):
+    """
+    Plays a recorded session back into per-channel sample queues.
+
+    The session is streamed from disk a chunk at a time and released in
+    batches every `batch_interval` seconds, `speed` times faster than it
+    was recorded. Timestamps are shifted onto the playback clock, `now()`,
+    which starts at `clock` and runs `speed` times as fast: samples keep
+    their recorded spacing, so detectors fed from the queues see the
+    session's real rates at any speed, and the queues look to a VitalCard
+    exactly like live acquisition. Drive anything that compares sample
+    times with the present (FrameScheduler, AlarmDetector) from `now`.
+    `add(channel)` returns the SampleQueue to use as its stream, as
+    Acquisition.add does.
+    `seek(t)` jumps to session time `t` (same clock as the recording) and
+    may be called while playing; with `loop` the session restarts at the
+    end, otherwise the thread stops there.
+    """
+
+    def __init__(
+        self,
+        directory,
+        speed=1.0,
+        loop=False,
+        batch_interval=0.02,
+        clock=time.monotonic,
+    ):
+        super().__init__(name="session-replay", daemon=True)
+        self.index = SessionIndex(directory)
+        self.speed = speed
+        self.loop = loop
+        self.batch_interval = batch_interval
+        self.clock = clock
+        self._queues = {}
+        self._seek = self.index.start
+        self._origin = None
+        self._pace = None  # (clock, playback time) when playing (re)started
+        self._stopping = threading.Event()
+
+    def add(self, channel, max_batches=256):
+        queue = SampleQueue(max_batches)
+        self._queues[channel] = queue
+        return queue
+
+    def now(self):
+        """Playback time, which queue timestamps are on."""
+        pace = self._pace
+        if pace is None:
+            return self.clock()
+        anchor, stamp = pace
+        return stamp + (self.clock() - anchor) * self.speed
+
+    def seek(self, t):
+        self._seek = t
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _dispatch(self, records, offset):
+        # offset maps session time onto playback time
+        channels = records["channel"]
+        for channel, queue in self._queues.items():
+            rows = records[channels == channel]
+            if len(rows):
+                t = rows["t"].astype(np.float64)
+                t -= offset
+                queue.put(t, rows["value"].astype(np.float64))
+
+    def run(self):
+        chunks = iter(())
+        pending = np.empty(0, RECORD)
+        while not self._stopping.wait(self.batch_interval):
+            if self._seek is not None:
+                start, self._seek = self._seek, None
+                chunks = self.index.chunks(*self.index.locate(start))
+                pending = np.empty(0, RECORD)
+                # Playback time carries on across seeks, so it never steps back
+                self._origin = start
+                self._pace = (self.clock(), self.now())
+
+            # Session time the playback clock has reached
+            offset = self._origin - self._pace[1]
+            target = self.now() + offset
+            while True:
+                cut = np.searchsorted(pending["t"], target, side="right")
+                if cut:
+                    self._dispatch(pending[:cut], offset)
+                    pending = pending[cut:]
+                if len(pending):
+                    break
+                pending = next(chunks, None)
+                if pending is None:
+                    pending = np.empty(0, RECORD)
+                    if self.loop:
+                        self._seek = self.index.start
+                        break
+                    return
+
+
+def synthesize_session(directory, channels, seconds, start=0.0, step=1.0):
+    """
+    Write a session of synthetic samples that SessionReplay can play.
+
+    `channels` maps a channel id to (rate, source), with `source` as for
+    SyntheticStream. Samples cover `seconds` from `start`.
+    """
+    streams = {
+        channel: SyntheticStream(rate, source, start=start)
+        for channel, (rate, source) in channels.items()
+    }
+    recorder = TrendRecorder(directory)
+    t = start
+    while t < start + seconds:
+        t = min(t + step, start + seconds)
+        for channel, stream in streams.items():
+            times, values = stream.read(t)
+            recorder.record(channel, times, values)
+    recorder.close()
+    return os.path.abspath(directory)
@@ -0,0 +1,124 @@
+from collections import deque
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity sample window with O(1) append and O(1) sliding min/max.
+
+    Samples live in a preallocated NumPy array that is written circularly, so
+    appending never shifts or reallocates. Two monotonic deques of
+    (sample index, value) pairs track the window minimum and maximum; each
+    sample is pushed and popped at most once, which makes min/max O(1)
+    amortized per append and O(1) per lookup.
+    """
+
+    def __init__(self, capacity, initial=None, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._count = 0  # total samples ever appended
+        self._min_q = deque()  # values increasing from front to back
+        self._max_q = deque()  # values decreasing from front to back
+        if initial is not None:
+            self.extend(initial)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def __iter__(self):
+        return iter(self.values())
+
+    @property
+    def count(self):
+        """Total number of samples appended since creation."""
+        return self._count
+
+    def append(self, value):
+        value = float(value)
+        i = self._count
+        self._data[i % self.capacity] = value
+        self._count = i + 1
+        # Only the sample that just fell out of the window can expire
+        expired = i - self.capacity
+
+        min_q = self._min_q
+        while min_q and min_q[-1][1] >= value:
+            min_q.pop()
+        min_q.append((i, value))
+        if min_q[0][0] <= expired:
+            min_q.popleft()
+
+        max_q = self._max_q
+        while max_q and max_q[-1][1] <= value:
+            max_q.pop()
+        max_q.append((i, value))
+        if max_q[0][0] <= expired:
+            max_q.popleft()
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype).ravel()
+        if len(values) >= self.capacity:
+            # Everything already in the window is overwritten anyway
+            self._count += len(values) - self.capacity
+            self._min_q.clear()
+            self._max_q.clear()
+            values = values[-self.capacity :]
+        for value in values.tolist():
+            self.append(value)
+
+    def last(self):
+        if not self._count:
+            raise IndexError("last() on an empty RingBuffer")
+        return float(self._data[(self._count - 1) % self.capacity])
+
+    def min(self):
+        if not self._min_q:
+            raise ValueError("min() on an empty RingBuffer")
+        return self._min_q[0][1]
+
+    def max(self):
+        if not self._max_q:
+            raise ValueError("max() on an empty RingBuffer")
+        return self._max_q[0][1]
+
+    def span(self, start, stop):
+        """
+        Return samples by absolute index, `start` inclusive, `stop` exclusive.
+
+        Indices count from the first sample ever appended (see `count`) and
+        must still be inside the window. The result is a view when the range
+        does not wrap around the end of storage, so treat it as read-only.
+        """
+        if not self._count - len(self) <= start <= stop <= self._count:
+            raise IndexError("span outside the current window")
+        lo = start % self.capacity
+        hi = lo + (stop - start)
+        if hi <= self.capacity:
+            return self._data[lo:hi]
+        return np.concatenate((self._data[lo:], self._data[: hi - self.capacity]))
+
+    def take(self, indices):
+        """Return the samples at absolute `indices` (see span) as a new array."""
+        return self._data[np.asarray(indices) % self.capacity]
+
+    def values(self, out=None):
+        """
+        Return the window oldest-first as a NumPy array.
+
+        If `out` is given it must hold len(self) elements and is filled in
+        place instead of allocating a new array.
+        """
+        n = len(self)
+        if out is None:
+            out = np.empty(n, dtype=self._data.dtype)
+        if self._count <= self.capacity:
+            out[:n] = self._data[:n]
+        else:
+            start = self._count % self.capacity
+            tail = self.capacity - start
+            out[:tail] = self._data[start:]
+            out[tail:n] = self._data[:start]
+        return out
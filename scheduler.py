@@ -0,0 +1,72 @@
+import time
+
+from kivy.clock import Clock
+
+
+class FrameScheduler:
+    """
+    Drives every vitals component from a single once-per-frame callback.
+
+    Each frame the scheduler asks every registered component to consume the
+    samples that arrived since the previous frame (`update_data(now)` returns
+    how many it took), marks those components dirty and then redraws only
+    the dirty ones in one pass. Frames that take longer than `budget` seconds
+    are counted in `overruns`; frames where a component had to take more
+    than a budget's worth of backlogged samples are counted in `catch_ups`.
+    Objects added with `add_ticker` get `tick(now)` once a frame after the
+    components have consumed their samples, e.g. to act on time passing
+    when no samples arrive.
+    """
+
+    def __init__(self, budget=1 / 30, clock=time.monotonic):
+        self.budget = budget
+        self.clock = clock
+        self.frames = 0
+        self.overruns = 0
+        self.catch_ups = 0
+        self.last_frame_time = 0.0
+        self._components = []
+        self._tickers = []
+        self._event = None
+
+    def add(self, component):
+        self._components.append(component)
+
+    def add_ticker(self, ticker):
+        self._tickers.append(ticker)
+
+    def start(self):
+        if self._event is None:
+            # An interval of 0 runs the callback once per frame
+            self._event = Clock.schedule_interval(self.tick, 0)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def tick(self, dt):
+        start = time.perf_counter()
+        now = self.clock()
+
+        dirty = []
+        behind = False
+        for component in self._components:
+            count = component.update_data(now)
+            if count:
+                dirty.append(component)
+                if (count - 1) * component.sample_interval > self.budget:
+                    behind = True
+
+        for ticker in self._tickers:
+            ticker.tick(now)
+
+        for component in dirty:
+            component.redraw()
+
+        self.last_frame_time = time.perf_counter() - start
+        self.frames += 1
+        if self.last_frame_time > self.budget:
+            self.overruns += 1
+        if behind:
+            self.catch_ups += 1
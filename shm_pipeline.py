@@ -0,0 +1,156 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from acquisition import AcquisitionThread
+
+_HEADER = 2  # int64 slots: total samples written, capacity
+
+
+class SharedRing:
+    """
+    Single-writer ring of (timestamp, value) samples in shared memory.
+
+    Layout: an int64 header [count, capacity] followed by `capacity` float64
+    timestamps and `capacity` float64 values. The writer fills the sample
+    slots before publishing the new count, and each reader keeps its own
+    cursor, so no locks are shared between processes. A reader that falls
+    more than `capacity` samples behind skips ahead and counts the loss in
+    `overruns`.
+
+    `put` matches SampleQueue.put so an AcquisitionThread can feed it, and
+    `read(now)` matches SyntheticStream.read so a component can drain it.
+    """
+
+    def __init__(self, capacity=None, name=None):
+        if name is None:
+            size = 8 * (_HEADER + 2 * capacity)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._header = np.ndarray(_HEADER, np.int64, buffer=self._shm.buf)
+            self._header[:] = (0, capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._header = np.ndarray(_HEADER, np.int64, buffer=self._shm.buf)
+            capacity = int(self._header[1])
+        self.capacity = capacity
+        buf = self._shm.buf
+        self._times = np.ndarray(capacity, np.float64, buf, 8 * _HEADER)
+        self._values = np.ndarray(capacity, np.float64, buf, 8 * (_HEADER + capacity))
+        self._cursor = int(self._header[0])
+        self.overruns = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def put(self, times, values):
+        n = len(values)
+        if n > self.capacity:
+            times, values = times[-self.capacity :], values[-self.capacity :]
+        count = int(self._header[0])
+        first = count + n - len(values)
+        index = np.arange(first, count + n) % self.capacity
+        self._times[index] = times
+        self._values[index] = values
+        # Publish only after the samples are in place
+        self._header[0] = count + n
+
+    def read(self, now=None):
+        """Copy out every sample written since the previous read."""
+        count = int(self._header[0])
+        start = max(self._cursor, count - self.capacity)
+        self.overruns += start - self._cursor
+        index = np.arange(start, count) % self.capacity
+        times = self._times[index]
+        values = self._values[index]
+        # The writer may have lapped the oldest samples while we copied
+        lapped = int(self._header[0]) - self.capacity - start
+        if lapped > 0:
+            times, values = times[lapped:], values[lapped:]
+            self.overruns += lapped
+        self._cursor = count
+        return times, values
+
+    def close(self):
+        # Views must be released before the mapping can be closed
+        self._header = self._times = self._values = None
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+def _worker(channels, stopping):
+    rings = [SharedRing(name=name) for name, _, _ in channels]
+    threads = [
+        AcquisitionThread(source, ring, filters)
+        for ring, (_, source, filters) in zip(rings, channels)
+    ]
+    for thread in threads:
+        thread.start()
+    stopping.wait()
+    for thread in threads:
+        thread.stop()
+    for thread in threads:
+        thread.join(1.0)
+    for ring in rings:
+        ring.close()
+
+
+class SharedMemoryPipeline:
+    """
+    Runs sensor acquisition in a separate worker process.
+
+    Same interface as Acquisition: `add(source)` returns the SharedRing the
+    UI reads from, and the sources are read by AcquisitionThreads inside
+    the worker, which write straight into shared memory. `filters` given
+    to `add` run in the worker too, before the samples are written. The
+    UI process then only maps the rings and renders, and no longer
+    competes with acquisition for the GIL. Sources and filters must be
+    picklable.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._rings = []
+        self._sources = []
+        self._filters = []
+        self._process = None
+        # Kivy and SDL do not survive fork(), so always start a clean process
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = self._context.Event()
+
+    def add(self, source, capacity=None, filters=None):
+        ring = SharedRing(capacity or self.capacity)
+        self._rings.append(ring)
+        self._sources.append(source)
+        self._filters.append(filters)
+        return ring
+
+    def start(self):
+        if self._process is not None:
+            return
+        names = [ring.name for ring in self._rings]
+        channels = list(zip(names, self._sources, self._filters))
+        self._process = self._context.Process(
+            target=_worker,
+            args=(channels, self._stopping),
+            name="acquisition-worker",
+            daemon=True,
+        )
+        self._process.start()
+
+    def stop(self, timeout=2.0):
+        if self._process is not None:
+            self._stopping.set()
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        for ring in self._rings:
+            ring.close()
+            ring.unlink()
+        self._rings = []
+        self._sources = []
+        self._filters = []
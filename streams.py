@@ -0,0 +1,57 @@
+import random
+import time
+
+import numpy as np
+
+
+class SyntheticStream:
+    """
+    Plays a generated signal in real time as timestamped samples.
+
+    Sample k is stamped `start + k / rate`. `read(now)` returns every sample
+    stamped at or before `now` that has not been read yet, so a consumer that
+    is called late simply receives more samples and stays in real time.
+
+    `source` is either a sequence, which is looped, or a callable taking a
+    sample count and returning that many new values.
+    """
+
+    def __init__(self, rate, source, start=None, clock=time.monotonic):
+        self.rate = rate
+        if callable(source):
+            self._generate = source
+            self._loop = None
+        else:
+            self._generate = None
+            self._loop = np.asarray(source, dtype=np.float64)
+        self.start = clock() if start is None else start
+        self._emitted = 0
+
+    def read(self, now):
+        """Return (timestamps, values) for every sample due by `now`."""
+        due = int((now - self.start) * self.rate) + 1
+        if due <= self._emitted:
+            return np.empty(0), np.empty(0)
+        index = np.arange(self._emitted, due)
+        self._emitted = due
+        times = self.start + index / self.rate
+        if self._loop is not None:
+            values = self._loop[index % len(self._loop)]
+        else:
+            values = np.asarray(self._generate(len(index)), dtype=np.float64)
+        return times, values
+
+    def history(self, count):
+        """Timestamps for `count` samples leading up to the first one."""
+        return self.start - np.arange(count, 0, -1) / self.rate
+
+
+class RandomSamples:
+    """SyntheticStream source of uniformly random integers in [low, high]."""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def __call__(self, count):
+        return [random.randint(self.low, self.high) for _ in range(count)]
@@ -0,0 +1,221 @@
+import mmap
+import os
+
+import numpy as np
+
+# (bucket seconds, seconds kept) per tier, finest first
+TIERS = ((1, 24 * 3600), (60, 7 * 24 * 3600), (600, 30 * 24 * 3600))
+# One aggregate bucket on disk; `t` is the bucket's start time
+BUCKET = np.dtype(
+    [("t", "<f8"), ("count", "<u4"), ("min", "<f4"), ("max", "<f4"), ("mean", "<f4")]
+)
+
+
+class _Aggregator:
+    """
+    Folds (t, count, min, max, sum) runs into fixed-width time buckets.
+
+    The newest bucket stays open until a later one starts; `add` returns
+    every bucket it closed, as arrays in the same form, so a coarser tier
+    can be fed from a finer one.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self._open = None  # [id, count, min, max, sum]
+
+    def holds(self, t):
+        """Whether time `t` falls in the open bucket."""
+        return self._open is not None and t // self.width == self._open[0]
+
+    def fold(self, count, lo, hi, total):
+        # Fast path for a run entirely inside the open bucket
+        bucket = self._open
+        bucket[1] += count
+        bucket[2] = min(bucket[2], lo)
+        bucket[3] = max(bucket[3], hi)
+        bucket[4] += total
+
+    def add(self, t, count, lo, hi, total):
+        ids = (t // self.width).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+        g_ids = ids[starts]
+        g_count = np.add.reduceat(count, starts)
+        g_min = np.minimum.reduceat(lo, starts)
+        g_max = np.maximum.reduceat(hi, starts)
+        g_sum = np.add.reduceat(total, starts)
+
+        closed = None
+        if self._open is not None:
+            bucket, n, mn, mx, s = self._open
+            if g_ids[0] <= bucket:
+                # Continues the open bucket (or is late for it)
+                g_ids[0] = bucket
+                g_count[0] += n
+                g_min[0] = min(g_min[0], mn)
+                g_max[0] = max(g_max[0], mx)
+                g_sum[0] += s
+            else:
+                closed = (bucket, n, mn, mx, s)
+        self._open = [g_ids[-1], g_count[-1], g_min[-1], g_max[-1], g_sum[-1]]
+
+        done = slice(0, len(g_ids) - 1)
+        out = (g_ids[done], g_count[done], g_min[done], g_max[done], g_sum[done])
+        if closed is not None:
+            out = tuple(np.concatenate(([c], a)) for c, a in zip(closed, out))
+        ids, count, lo, hi, total = out
+        return ids * float(self.width), count, lo, hi, total
+
+
+class _TierFile:
+    """
+    Per-channel rings of BUCKETs in one memory-mapped file.
+
+    The file is reopened as-is when its shape matches, so a restart has its
+    history back without reading anything up front.
+    """
+
+    def __init__(self, path, channels, slots):
+        self.channels = channels
+        self.slots = slots
+        # int64 header: channels, slots, then a write count per channel
+        header = 2 + channels
+        size = 8 * header + channels * slots * BUCKET.itemsize
+        fresh = not os.path.exists(path) or os.path.getsize(path) != size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.header = np.ndarray(header, np.int64, self._mm)
+        if fresh or tuple(self.header[:2]) != (channels, slots):
+            self.header[:] = 0
+            self.header[:2] = (channels, slots)
+        self.rings = np.ndarray((channels, slots), BUCKET, self._mm, 8 * header)
+
+    def append(self, channel, t, count, lo, hi, total):
+        n = len(t)
+        if n == 0:
+            return
+        written = int(self.header[2 + channel])
+        index = np.arange(written, written + n) % self.slots
+        ring = self.rings[channel]
+        ring["t"][index] = t
+        ring["count"][index] = count
+        ring["min"][index] = lo
+        ring["max"][index] = hi
+        ring["mean"][index] = total / count
+        self.header[2 + channel] = written + n
+
+    def query(self, channel, start, stop):
+        """Buckets of `channel` starting in [start, stop), oldest first."""
+        written = int(self.header[2 + channel])
+        ring = self.rings[channel]
+        if written <= self.slots:
+            parts = (ring[:written],)
+        else:
+            head = written % self.slots
+            parts = (ring[head:], ring[:head])
+        out = []
+        for part in parts:
+            lo, hi = np.searchsorted(part["t"], (start, stop))
+            out.append(part[lo:hi])
+        return out[0].copy() if len(out) == 1 else np.concatenate(out)
+
+    def covers(self, channel, start):
+        """Whether every bucket from `start` on is still in the ring."""
+        written = int(self.header[2 + channel])
+        if written <= self.slots:
+            return True  # never wrapped, so nothing was overwritten
+        return self.rings[channel]["t"][written % self.slots] <= start
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self.flush()
+        del self.header, self.rings
+        self._mm.close()
+
+
+class TrendPyramid:
+    """
+    Min/max/mean of every channel at several time resolutions.
+
+    Samples fold into 1 s buckets as they arrive; each closed bucket folds
+    into the 1 min tier, and those into the 10 min tier, so keeping every
+    tier current costs about as much as keeping the finest one. Each tier is
+    a set of fixed-size per-channel rings in a memory-mapped file in
+    `directory` (TIERS says how long each keeps), flushed with the trend
+    segments; the bucket still open in each tier lives only in memory.
+
+    `view()` answers any time range from the finest tier that needs no
+    more than one bucket per pixel, so drawing 1 h or 24 h costs the same.
+    `add()` must be called with non-decreasing times per channel.
+    """
+
+    def __init__(self, directory, channels, tiers=TIERS):
+        os.makedirs(directory, exist_ok=True)
+        self.widths = [width for width, _ in tiers]
+        self._files = [
+            _TierFile(
+                os.path.join(directory, f"tier-{width}s.trend"),
+                channels,
+                -(-kept // width),
+            )
+            for width, kept in tiers
+        ]
+        self._aggregators = [
+            [_Aggregator(width) for width in self.widths] for _ in range(channels)
+        ]
+
+    def add(self, channel, times, values):
+        if not len(values):
+            return
+        values = np.asarray(values, dtype=np.float64)
+        finest = self._aggregators[channel][0]
+        if finest.holds(times[-1]):
+            # Most frames add a few samples to the current second; only
+            # closing a bucket needs the general path
+            finest.fold(len(values), values.min(), values.max(), values.sum())
+            return
+        runs = (
+            np.asarray(times),
+            np.ones(len(values), np.uint32),
+            values,
+            values,
+            values,
+        )
+        for aggregator, tier in zip(self._aggregators[channel], self._files):
+            runs = aggregator.add(*runs)
+            if not len(runs[0]):
+                break
+            tier.append(channel, *runs)
+
+    def view(self, channel, start, stop, pixels):
+        """
+        Buckets covering [start, stop) for a trend `pixels` wide.
+
+        Returns (width, buckets): the tier's bucket width in seconds and a
+        BUCKET array, oldest first, with at most about `pixels` entries.
+        """
+        span = stop - start
+        choice = len(self._files) - 1
+        for i, (width, tier) in enumerate(zip(self.widths, self._files)):
+            if span / width <= pixels and tier.covers(channel, start):
+                choice = i
+                break
+        width = self.widths[choice]
+        start = start // width * width
+        return width, self._files[choice].query(channel, start, stop)
+
+    def flush(self):
+        for tier in self._files:
+            tier.flush()
+
+    def close(self):
+        for tier in self._files:
+            tier.close()
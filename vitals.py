@@ -0,0 +1,210 @@
+import os
+
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Line, Mesh, Rectangle, RoundedRectangle
+from kivy.metrics import dp, sp
+from kivy.uix.widget import Widget
+
+from digits import DigitSlots
+from icons import icon_texture
+from plotting import SweepPlot, WaveformPlot
+from ringbuffer import RingBuffer
+from streams import SyntheticStream
+
+BOLD_FONT = os.path.join("assets", "Roboto-Bold.ttf")
+ACCENT = (126 / 255, 255 / 255, 236 / 255, 1)
+MUTED = (0.7, 0.7, 0.7, 1)
+
+
+def label_texture(text, font_name, font_size):
+    label = CoreLabel(text=text, font_name=font_name, font_size=font_size)
+    label.refresh()
+    return label.texture
+
+
+class VitalCard(Widget):
+    """
+    One vital sign: icon, title, live value, window min/max and a trace.
+
+    Everything is drawn with a fixed set of canvas instructions on this one
+    widget; there are no child layouts. Geometry is worked out once per
+    resize in `_layout`, and a frame only swaps digit textures and the
+    trace's points.
+
+    `source` and `sample_interval` feed the card's SyntheticStream (the app
+    may swap `stream` for an acquisition queue). The window holds
+    `capacity` samples, prefilled with `initial` (default: one loop of a
+    sequence source; empty for none). `value_range` is the span of values
+    the trace's height covers.
+
+    `mode` is "scroll" (the whole window shifts left each frame) or "sweep"
+    (a cursor overwrites the previous lap; see SweepPlot). Sweep traces are
+    drawn with a Mesh, so they are always one pixel wide.
+    """
+
+    def __init__(
+        self,
+        title,
+        icon,
+        source,
+        sample_interval,
+        value_range,
+        capacity=None,
+        initial=None,
+        line_width=2,
+        mode="scroll",
+        channel=None,
+        **kwargs,
+    ):
+        kwargs.setdefault("size_hint_y", None)
+        kwargs.setdefault("height", dp(190))
+        super().__init__(**kwargs)
+        self.sample_interval = sample_interval
+        self.value_range = value_range
+        self.mode = mode
+        # Each sink is called as sink(channel, times, values) with every
+        # chunk consumed, e.g. TrendRecorder.record or AlarmDetector.feed
+        self.channel = channel
+        self.sinks = []
+        # Set `filters` (e.g. a FilterChain) to clean each chunk before the
+        # buffers and sinks see it
+        self.filters = None
+        # Set `reading` to a callable returning the number to show (None
+        # for "--") when the raw last sample is not the clinical value
+        self.reading = None
+        # Set `rate` to a callable returning the samples/s the source
+        # reports (None until known) to re-size the window to match it
+        self.rate = None
+
+        # Data buffer, prefilled with one loop of the synthetic waveform
+        if capacity is None:
+            capacity = len(source)
+        if initial is None:
+            initial = source
+        self.stream = SyntheticStream(1 / sample_interval, source)
+        self.data_buffer = RingBuffer(capacity, initial)
+        self.time_buffer = RingBuffer(capacity, self.stream.history(len(initial)))
+
+        font_name = BOLD_FONT if os.path.exists(BOLD_FONT) else "Roboto"
+        self._font_name = font_name
+        with self.canvas:
+            Color(148 / 255, 155 / 255, 164 / 255, 0.20)
+            self._bg = RoundedRectangle(radius=[(28, 28)] * 4)
+            Color(1, 1, 1, 1)
+            self._icon = Rectangle(texture=icon_texture(icon))
+            Color(*ACCENT)
+            self._title = Rectangle(texture=label_texture(title, font_name, 14))
+            self._title.size = self._title.texture.size
+        self._value = DigitSlots(self.canvas)
+        self._max = DigitSlots(self.canvas, MUTED)
+        self._min = DigitSlots(self.canvas, MUTED)
+        with self.canvas:
+            Color(*ACCENT)
+            if mode == "sweep":
+                self.graph_mesh = Mesh(mode="lines")
+                self._plot = SweepPlot()
+            else:
+                self.graph_line = Line(width=dp(line_width))
+                self._plot = WaveformPlot()
+        self._graph = (0, 0, 0, 0)
+        self._boxes = {}
+
+        self.bind(pos=self._layout, size=self._layout)
+        self._layout()
+
+    def _layout(self, *args):
+        x, y = self.pos
+        w, h = self.size
+        top = y + h
+
+        self._bg.pos = self.pos
+        self._bg.size = self.size
+        self._icon.pos = (x + w * 0.01, top - h * 0.05 - dp(87))
+        self._icon.size = (dp(89), dp(87))
+        title_h = self._title.size[1]
+        self._title.pos = (x + dp(104), top - dp(30) - title_h / 2)
+
+        # Value under the title, min/max beside the trace, trace to the right
+        self._boxes = {
+            "value": ((x + dp(104), y + dp(16)), (dp(195), h - dp(60))),
+            "max": ((x + dp(330), top - dp(50)), (dp(60), dp(30))),
+            "min": ((x + dp(330), y + dp(20)), (dp(60), dp(30))),
+        }
+        gx = x + dp(400)
+        self._graph = (gx, y + dp(24), max(0, x + w - dp(104) - gx), h - dp(48))
+        self.redraw()
+
+    def update_data(self, now):
+        if self.rate is not None:
+            rate = self.rate()
+            if rate and abs(rate * self.sample_interval - 1) > 1e-3:
+                self.set_rate(rate)
+        # Consume every sample that arrived since the last frame
+        times, values = self.stream.read(now)
+        if self.filters is not None and len(values):
+            values = self.filters.process(values)
+        self.time_buffer.extend(times)
+        self.data_buffer.extend(values)
+        if len(values):
+            for sink in self.sinks:
+                sink(self.channel, times, values)
+        return len(values)
+
+    def set_rate(self, rate):
+        """Re-size the window for `rate` samples/s, keeping its length in
+        seconds and the samples it holds."""
+        seconds = self.data_buffer.capacity * self.sample_interval
+        capacity = max(2, round(seconds * rate))
+        self.sample_interval = 1 / rate
+        self.data_buffer = RingBuffer(capacity, self.data_buffer.values())
+        self.time_buffer = RingBuffer(capacity, self.time_buffer.values())
+
+    def clear(self):
+        """Empty the window, e.g. of its synthetic prefill once real samples
+        feed the card."""
+        capacity = self.data_buffer.capacity
+        self.data_buffer = RingBuffer(capacity)
+        self.time_buffer = RingBuffer(capacity)
+        self.redraw()
+
+    def redraw(self):
+        boxes = self._boxes
+        font = self._font_name
+        buffer = self.data_buffer
+        # An empty window shows "--" rather than made-up numbers
+        empty = not len(buffer)
+        if self.reading is not None:
+            value = self.reading()
+        else:
+            value = None if empty else buffer.last()
+        self._value.show(value, font, sp(72), "right", *boxes["value"])
+        high = None if empty else buffer.max()
+        low = None if empty else buffer.min()
+        self._max.show(high, font, sp(16), "left", *boxes["max"])
+        self._min.show(low, font, sp(16), "left", *boxes["min"])
+        self.update_graph()
+
+    def update_graph(self, *args):
+        # WaveformPlot draws baseline + (value - 100) / 10 * amplitude; pick
+        # both so value_range spans the graph box bottom to top
+        gx, gy, width, height = self._graph
+        lo, hi = self.value_range
+        amplitude = height * 10 / (hi - lo)
+        baseline = gy - (lo - 100) / 10 * amplitude
+
+        if self.mode == "sweep":
+            vertices, indices = self._plot.update(
+                self.data_buffer, gx, width, baseline, amplitude
+            )
+            self.graph_mesh.vertices = vertices
+            self.graph_mesh.indices = indices
+            return
+        self.graph_line.points = self._plot.points(
+            self.data_buffer,
+            gx,
+            width,
+            baseline,
+            amplitude,
+            times=self.time_buffer,
+            span=(self.data_buffer.capacity - 1) * self.sample_interval,
+        )